@@ -1,8 +1,12 @@
 import streamlit as st
-from utils import extract_website_content, split_text_into_chunks, create_vectorstore, generate_rag_response
+from utils import extract_website_content, split_text_into_chunks, create_vectorstore, generate_rag_response, get_embedding_stats, get_retrieval_stats, get_llm_stats, prewarm, CircuitOpenError, is_retryable
 import os
 from dotenv import load_dotenv
 import time
+from history import ChatHistory
+
+# Number of most recent messages rendered per page of chat history
+HISTORY_PAGE_SIZE = int(os.getenv("CHAT_HISTORY_PAGE_SIZE", "20"))
 
 # Load environment variables
 load_dotenv()
@@ -376,9 +380,45 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Answer a question, turning upstream outages into a chat message
+def answer_question(question):
+    try:
+        return generate_rag_response(question, st.session_state.vectorstore)
+    except CircuitOpenError:
+        return "⚠️ The AI service is having trouble right now. Please try again in a few seconds."
+    except TimeoutError:
+        return "⚠️ The AI took too long to respond. Please try again."
+    except Exception as e:
+        # Transient upstream errors that outlasted every retry
+        if is_retryable(e):
+            return "⚠️ The AI service is having trouble right now. Please try again in a few seconds."
+        raise
+
+# Build the chat bubble HTML for one message
+def message_html(message):
+    if message["role"] == "user":
+        return f"""
+        <div class="chat-message user">
+            <div class="message-bubble user">
+                {message["content"]}
+            </div>
+            <div class="avatar user">👤</div>
+        </div>
+        """
+    return f"""
+        <div class="chat-message assistant">
+            <div class="avatar assistant">🤖</div>
+            <div class="message-bubble assistant">
+                {message["content"]}
+            </div>
+        </div>
+        """
+
 # Initialize session state
 if "messages" not in st.session_state:
-    st.session_state.messages = []
+    st.session_state.messages = ChatHistory.for_session()
+if "history_pages" not in st.session_state:
+    st.session_state.history_pages = 1
 if "website_content" not in st.session_state:
     st.session_state.website_content = None
 if "chunks" not in st.session_state:
@@ -515,6 +555,23 @@ with st.sidebar:
             """, 
             unsafe_allow_html=True
         )
+        embedding_stats = get_embedding_stats()
+        st.caption(
+            f"🧮 Embeddings: {embedding_stats['texts_per_second']:.0f} texts/s"
+            + (f" · cache hit rate {embedding_stats['cache_hit_rate']:.0%}" if "cache_hit_rate" in embedding_stats else "")
+        )
+        retrieval_stats = get_retrieval_stats()
+        if retrieval_stats["count"]:
+            st.caption(
+                f"🎯 Rerank: p50 {retrieval_stats['p50_ms']:.1f} ms · p95 {retrieval_stats['p95_ms']:.1f} ms"
+                f" · {retrieval_stats['fallbacks']} over budget"
+            )
+        llm_stats = get_llm_stats()
+        if llm_stats["count"]:
+            st.caption(
+                f"🤖 Gemini: p50 {llm_stats['p50_ms'] / 1000:.1f} s · p99 {llm_stats['p99_ms'] / 1000:.1f} s"
+                f" · {llm_stats['retries']} retries · circuit {llm_stats['breaker_state']}"
+            )
     
     # About section
     st.markdown("---")
@@ -562,7 +619,7 @@ if st.session_state.process_clicked:
             if st.button(question, key=f"sample_q_{i}", help=f"Ask: {question}"):
                 st.session_state.messages.append({"role": "user", "content": question})
                 with st.spinner("🤖 AI is thinking..."):
-                    response = generate_rag_response(question, st.session_state.vectorstore)
+                    response = answer_question(question)
                     st.session_state.messages.append({"role": "assistant", "content": response})
                 st.rerun()
     
@@ -576,25 +633,16 @@ if st.session_state.process_clicked:
     
     with chat_container:
         if st.session_state.messages:
-            for i, message in enumerate(st.session_state.messages):
-                if message["role"] == "user":
-                    st.markdown(f"""
-                    <div class="chat-message user">
-                        <div class="message-bubble user">
-                            {message["content"]}
-                        </div>
-                        <div class="avatar user">👤</div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                else:
-                    st.markdown(f"""
-                    <div class="chat-message assistant">
-                        <div class="avatar assistant">🤖</div>
-                        <div class="message-bubble assistant">
-                            {message["content"]}
-                        </div>
-                    </div>
-                    """, unsafe_allow_html=True)
+            # Only the newest pages are rendered; older turns load on demand
+            shown = st.session_state.history_pages * HISTORY_PAGE_SIZE
+            hidden = len(st.session_state.messages) - shown
+            if hidden > 0 and st.button(f"⬆️ Load older messages ({hidden} hidden)", key="load_older"):
+                st.session_state.history_pages += 1
+                st.rerun()
+            st.markdown(
+                "".join(message_html(message) for message in st.session_state.messages.latest(shown)),
+                unsafe_allow_html=True
+            )
         else:
             st.markdown('<div class="status-info">👋 Ask your first question to get started!</div>', unsafe_allow_html=True)
     
@@ -608,7 +656,7 @@ if st.session_state.process_clicked:
         
         # Generate response
         with st.spinner("🤖 AI is analyzing and responding..."):
-            response = generate_rag_response(user_query, st.session_state.vectorstore)
+            response = answer_question(user_query)
             st.session_state.messages.append({"role": "assistant", "content": response})
         
         # Rerun to show new messages
@@ -632,3 +680,6 @@ else:
         <p style="color: var(--text-secondary); font-style: italic; margin-top: 1rem;">👈 Start by clicking "Process Website" in the sidebar</p>
     </div>
     """, unsafe_allow_html=True)
+
+# Load heavy dependencies in the background now that the page has rendered
+prewarm()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Benchmark app.py rerun latency as the conversation grows.
+
+Each configuration runs the real script with Streamlit's AppTest harness,
+with a chat history of the given number of turns already in session state.
+"paged" is the default rendering (newest page only); "full" expands the
+history so every message is rendered, as app.py used to on each rerun.
+
+    python bench_chat_history.py --turns 10 100 1000 5000
+"""
+
+import argparse
+import statistics
+import time
+
+from streamlit.testing.v1 import AppTest
+
+from history import ChatHistory
+
+
+def _history(turns):
+    history = ChatHistory()
+    for i in range(turns):
+        history.append({"role": "user", "content": f"Question {i}: what does the page say about topic {i}?"})
+        history.append({"role": "assistant", "content": f"Answer {i}: " + "The page explains it in detail. " * 8})
+    return history
+
+
+def measure_rerun(turns, mode, repeats):
+    at = AppTest.from_file("app.py", default_timeout=120)
+    at.session_state["messages"] = _history(turns)
+    at.session_state["process_clicked"] = True
+    at.session_state["current_url"] = "https://example.com"
+    at.session_state["google_api_key"] = "benchmark"
+    # Enough pages to cover every message reproduces the old full render
+    at.session_state["history_pages"] = 1 if mode == "paged" else turns
+    at.run()
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        at.run()
+        timings.append((time.perf_counter() - start) * 1000)
+    assert not at.exception, at.exception
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'turns':>8} {'paged ms':>10} {'full ms':>10}")
+    for turns in args.turns:
+        paged = measure_rerun(turns, "paged", args.repeats)
+        full = measure_rerun(turns, "full", args.repeats)
+        print(f"{turns:>8} {paged:>10.1f} {full:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from abc import abstractmethod
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+DEFAULT_CACHE_PATH = os.path.join(".cache", "embeddings.sqlite")
+DEFAULT_CACHE_MAX_ROWS = 100000
+
+# Stable digest of a piece of text, used as the cache key
+def text_digest(text):
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+# Runs one batch inside a pool worker (must be module level so it pickles)
+def _embed_batch(backend, texts):
+    return backend.embed_batch(texts)
+
+
+class EmbeddingBackend(Embeddings):
+    """Base class for embedding models with batching and an optional worker pool.
+
+    Subclasses implement ``embed_batch`` and set ``backend_id``, which must
+    change whenever the vectors a backend produces would change.
+    """
+
+    backend_id = None
+
+    def __init__(self, batch_size=64, workers=1, executor="thread"):
+        """Configure batching and the pool used for CPU inference"""
+        if executor not in ("thread", "process"):
+            raise ValueError(f"Unknown executor type: {executor}")
+        self.batch_size = max(1, int(batch_size))
+        self.workers = max(1, int(workers))
+        self.executor = executor
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._texts_embedded = 0
+        self._seconds = 0.0
+
+    def __getstate__(self):
+        # Pools and locks cannot cross process boundaries
+        state = self.__dict__.copy()
+        state["_pool"] = None
+        state["_pool_lock"] = None
+        state["_stats_lock"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._pool_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+
+    @abstractmethod
+    def embed_batch(self, texts):
+        """Embed one batch of texts, returning a list of float32 vectors."""
+
+    def _get_pool(self):
+        with self._pool_lock:
+            if self._pool is None:
+                pool_cls = ThreadPoolExecutor if self.executor == "thread" else ProcessPoolExecutor
+                self._pool = pool_cls(max_workers=self.workers)
+            return self._pool
+
+    def embed_documents(self, texts):
+        """Embed texts in batches, spreading batches over the worker pool."""
+        texts = list(texts)
+        if not texts:
+            return []
+        start = time.perf_counter()
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        if self.workers > 1 and len(batches) > 1:
+            pool = self._get_pool()
+            results = pool.map(_embed_batch, [self] * len(batches), batches)
+        else:
+            results = (self.embed_batch(batch) for batch in batches)
+        embeddings = [vector for batch in results for vector in batch]
+        elapsed = time.perf_counter() - start
+        with self._stats_lock:
+            self._texts_embedded += len(texts)
+            self._seconds += elapsed
+        return embeddings
+
+    def embed_query(self, text):
+        """Embed a single query text."""
+        return self.embed_documents([text])[0]
+
+    def stats(self):
+        """Return embedding counts and throughput in texts per second."""
+        with self._stats_lock:
+            texts, seconds = self._texts_embedded, self._seconds
+        return {
+            "backend_id": self.backend_id,
+            "texts_embedded": texts,
+            "embed_seconds": seconds,
+            "texts_per_second": texts / seconds if seconds else 0.0,
+        }
+
+    def close(self):
+        """Shut down the worker pool, if one was started."""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+
+# Simple embedding function to avoid dependency issues
+class SimpleEmbeddings(EmbeddingBackend):
+    """Simple deterministic embeddings based on text hash"""
+
+    def __init__(self, size=768, **kwargs):
+        """Initialize with embedding dimension size"""
+        super().__init__(**kwargs)
+        self.size = size
+        self.backend_id = f"hashing-{size}"
+
+    def embed_batch(self, texts):
+        """Generate deterministic embeddings based on text content hash."""
+        embeddings = []
+        for text in texts:
+            # A per-text generator keeps this stable across processes and threads
+            text_seed = int.from_bytes(text_digest(text)[:4], "little")
+            rng = np.random.RandomState(text_seed)
+            embeddings.append(rng.rand(self.size).astype(np.float32))
+        return embeddings
+
+
+# Model instances are kept per process so pool workers load them only once
+_MODELS = {}
+_MODELS_LOCK = threading.Lock()
+
+class SentenceTransformerEmbeddings(EmbeddingBackend):
+    """CPU embeddings from a sentence-transformers model (optional dependency)"""
+
+    def __init__(self, model_name="sentence-transformers/all-MiniLM-L6-v2", **kwargs):
+        """Initialize with the model name; the model is loaded on first use"""
+        super().__init__(**kwargs)
+        self.model_name = model_name
+        self.backend_id = f"st-{model_name}"
+
+    def _model(self):
+        with _MODELS_LOCK:
+            model = _MODELS.get(self.model_name)
+            if model is None:
+                try:
+                    from sentence_transformers import SentenceTransformer
+                except ImportError as e:
+                    raise ImportError(
+                        "sentence-transformers is required for this embedding backend. "
+                        "Install it with `pip install sentence-transformers`."
+                    ) from e
+                model = SentenceTransformer(self.model_name, device="cpu")
+                _MODELS[self.model_name] = model
+        return model
+
+    def embed_batch(self, texts):
+        """Encode a batch of texts with the model."""
+        vectors = self._model().encode(texts, batch_size=len(texts), convert_to_numpy=True)
+        return [np.asarray(vector, dtype=np.float32) for vector in vectors]
+
+
+class EmbeddingCache:
+    """Persistent embedding store in SQLite keyed by (backend id, text digest).
+
+    Holds at most ``max_rows`` vectors; past that the least recently used
+    rows are pruned.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_rows=DEFAULT_CACHE_MAX_ROWS):
+        """Open (or create) the cache database at path"""
+        self.path = path
+        self.max_rows = max(1, int(max_rows))
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "backend_id TEXT NOT NULL, digest BLOB NOT NULL, vector BLOB NOT NULL, "
+                "last_used INTEGER NOT NULL DEFAULT 0, "
+                "PRIMARY KEY (backend_id, digest)) WITHOUT ROWID"
+            )
+            # Caches written before eviction existed lack the LRU column
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(embeddings)")}
+            if "last_used" not in columns:
+                self._conn.execute("ALTER TABLE embeddings ADD COLUMN last_used INTEGER NOT NULL DEFAULT 0")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+            self._conn.commit()
+
+    def get_many(self, backend_id, digests):
+        """Return a dict mapping each cached digest to its vector."""
+        found = {}
+        digests = list(digests)
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit
+            for i in range(0, len(digests), 500):
+                part = digests[i:i + 500]
+                placeholders = ",".join("?" * len(part))
+                rows = self._conn.execute(
+                    f"SELECT digest, vector FROM embeddings WHERE backend_id = ? AND digest IN ({placeholders})",
+                    [backend_id, *part],
+                )
+                for digest, vector in rows:
+                    found[digest] = np.frombuffer(vector, dtype=np.float32)
+            if found:
+                now = time.time_ns()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE backend_id = ? AND digest = ?",
+                    [(now, backend_id, digest) for digest in found],
+                )
+                self._conn.commit()
+            self.hits += len(found)
+            self.misses += len(digests) - len(found)
+        return found
+
+    def put_many(self, backend_id, items):
+        """Store (digest, vector) pairs for a backend, pruning past max_rows."""
+        now = time.time_ns()
+        rows = [(backend_id, digest, np.asarray(vector, dtype=np.float32).tobytes(), now) for digest, vector in items]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (backend_id, digest, vector, last_used) VALUES (?, ?, ?, ?)", rows
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            if count > self.max_rows:
+                # Prune to 90% of the cap so eviction is not paid on every insert
+                self._conn.execute(
+                    "DELETE FROM embeddings WHERE (backend_id, digest) IN "
+                    "(SELECT backend_id, digest FROM embeddings ORDER BY last_used LIMIT ?)",
+                    (count - self.max_rows * 9 // 10,),
+                )
+            self._conn.commit()
+
+    def stats(self):
+        """Return lookup counts and the hit rate."""
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {"cache_hits": hits, "cache_misses": misses, "cache_hit_rate": hits / total if total else 0.0}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings that consult an EmbeddingCache before calling the backend"""
+
+    def __init__(self, backend, cache):
+        """Wrap backend so previously seen texts are served from cache"""
+        self.backend = backend
+        self.cache = cache
+
+    @property
+    def backend_id(self):
+        return self.backend.backend_id
+
+    def _embed(self, texts, backend_id, embed_fn):
+        digests = [text_digest(text) for text in texts]
+        found = self.cache.get_many(backend_id, set(digests))
+        # Embed each distinct missing text once
+        missing = {}
+        for digest, text in zip(digests, texts):
+            if digest not in found and digest not in missing:
+                missing[digest] = text
+        if missing:
+            vectors = embed_fn(list(missing.values()))
+            new_items = list(zip(missing.keys(), vectors))
+            self.cache.put_many(backend_id, new_items)
+            found.update(new_items)
+        return [found[digest] for digest in digests]
+
+    def embed_documents(self, texts):
+        """Embed document texts, reusing cached vectors."""
+        return self._embed(list(texts), self.backend.backend_id, self.backend.embed_documents)
+
+    def embed_query(self, text):
+        """Embed query text with the backend."""
+        # Distinct questions are rarely repeated, so caching them would only grow the file
+        return self.backend.embed_query(text)
+
+    def stats(self):
+        """Return backend throughput together with cache hit rate."""
+        return {**self.backend.stats(), **self.cache.stats()}
+
+
+# Build the embedding backend selected by environment variables
+def create_embedding_backend():
+    backend = os.getenv("EMBEDDING_BACKEND", "hashing")
+    options = {
+        "batch_size": int(os.getenv("EMBEDDING_BATCH_SIZE", "64")),
+        "workers": int(os.getenv("EMBEDDING_WORKERS", "1")),
+        "executor": os.getenv("EMBEDDING_EXECUTOR", "thread"),
+    }
+    if backend == "hashing":
+        return SimpleEmbeddings(size=int(os.getenv("EMBEDDING_SIZE", "768")), **options)
+    if backend == "sentence-transformers":
+        return SentenceTransformerEmbeddings(os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2"), **options)
+    raise ValueError(f"Unknown embedding backend: {backend}")
+
+# Process-wide default embeddings, shared by every session
+@lru_cache(maxsize=None)
+def get_default_embeddings():
+    backend = create_embedding_backend()
+    cache_path = os.getenv("EMBEDDING_CACHE_PATH", DEFAULT_CACHE_PATH)
+    if not cache_path:
+        return backend
+    max_rows = int(os.getenv("EMBEDDING_CACHE_MAX_ROWS", str(DEFAULT_CACHE_MAX_ROWS)))
+    return CachedEmbeddings(backend, EmbeddingCache(cache_path, max_rows=max_rows))
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""Regenerate sweep_corpus.json, checking every labeled passage occurs in its document.
+
+Besides the four labeled documents the corpus holds many generated
+distractor documents on the same topics. They reuse the labeled documents'
+vocabulary, so retrieval has to find each passage among hundreds of
+kilobytes of plausible text rather than a handful of chunks.
+"""
+
+import os
+import json
+import random
+
+# Distractor documents per topic, and sentences per distractor document
+DISTRACTORS_PER_TOPIC = 60
+DISTRACTOR_SENTENCES = (20, 40)
+SEED = 33
+
+DOCUMENTS = {
+    "solar": [
+        "Solar power converts energy from sunlight into electricity, either directly using photovoltaics or indirectly using concentrated solar power.",
+        "A photovoltaic cell is made of semiconductor material, most commonly crystalline silicon. When photons strike the cell they knock electrons loose, and the electric field built into the junction drives them through an external circuit as direct current.",
+        "Commercial silicon panels typically convert between 18 and 23 percent of the sunlight that reaches them into electricity. Laboratory multi-junction cells have exceeded 47 percent efficiency under concentrated light, but they are far too expensive for rooftops.",
+        "Because panels produce direct current and the grid uses alternating current, every installation needs an inverter. String inverters serve a whole row of panels, while microinverters sit behind each panel so that shading on one panel does not drag down the others.",
+        "Panel output falls as temperature rises. A typical temperature coefficient is about minus 0.4 percent per degree Celsius, which is why panels in cool, sunny climates can outperform identical panels in hot deserts.",
+        "Concentrated solar power plants use mirrors to focus sunlight onto a receiver that heats a fluid. Many plants store heat in molten salt tanks, letting them keep generating electricity for several hours after sunset.",
+        "The cost of solar modules fell by roughly 90 percent between 2010 and 2020, driven by larger factories, thinner wafers and improved manufacturing yields.",
+        "Most panel manufacturers guarantee that output will stay above 80 percent of the original rating after 25 years. Degradation is usually around half a percent per year.",
+        "Net metering lets households that export surplus electricity to the grid receive credit on their bills, which shortens the payback period of a rooftop system.",
+        "At the end of their life, panels can be recycled to recover glass, aluminium frames and silver, although recycling capacity is still small compared with the volume of panels installed.",
+    ],
+    "coffee": [
+        "Coffee is brewed from the roasted seeds of the Coffea plant, which are commonly called beans even though they are the pits of a cherry-like fruit.",
+        "According to a popular legend, an Ethiopian goat herder named Kaldi noticed that his goats became energetic after eating the red berries of a certain shrub. The story is first recorded centuries after the events it describes.",
+        "The earliest credible evidence of coffee drinking comes from Sufi monasteries in Yemen in the fifteenth century, where monks drank it to stay awake during night-time prayers.",
+        "Coffee houses spread from Mecca and Cairo to Istanbul in the sixteenth century. In Europe they became known as penny universities, because for the price of a cup anyone could listen to debates and read newspapers.",
+        "The two species that dominate trade are arabica and robusta. Arabica grows at higher altitudes and has a sweeter, more acidic flavour, while robusta is hardier and contains roughly twice as much caffeine.",
+        "Brazil has been the largest coffee producer in the world for more than 150 years, followed by Vietnam, which mainly grows robusta.",
+        "Roasting transforms green beans through the Maillard reaction and caramelisation. Light roasts keep more of the origin flavours, while dark roasts taste more of the roast itself.",
+        "Espresso is made by forcing hot water at about nine bars of pressure through finely ground coffee, producing a concentrated shot topped with crema.",
+        "Decaffeinated coffee is produced before roasting, for example with the Swiss Water process, which uses water and activated carbon filters instead of chemical solvents.",
+        "Coffee leaf rust, a fungal disease, wiped out the coffee plantations of Ceylon in the 1870s, and the island's planters switched to growing tea instead.",
+    ],
+    "aqueducts": [
+        "Roman aqueducts carried water from distant springs into cities, supplying public baths, fountains, latrines and private households.",
+        "The first aqueduct serving Rome, the Aqua Appia, was built in 312 BC and ran almost entirely underground for about 16 kilometres.",
+        "Aqueducts moved water by gravity alone. Engineers kept a very gentle, constant downward gradient, in some sections as little as 34 centimetres per kilometre.",
+        "The famous arched bridges were only a small part of each aqueduct. Most of the channel ran in covered trenches or tunnels, which protected the water from contamination and evaporation.",
+        "Where a valley was too deep for a bridge, engineers built inverted siphons: sealed lead or stone pipes that carried water down one side of the valley and up the other under pressure.",
+        "The Pont du Gard in southern France carried the aqueduct of Nîmes across the Gardon river. Its three tiers of arches stand almost 49 metres high.",
+        "By the third century AD eleven aqueducts supplied Rome, delivering an estimated one million cubic metres of water per day.",
+        "Water arrived at a distribution tank called a castellum divisorium, which split the flow between public fountains, baths and paying private customers.",
+        "The curator aquarum was the official responsible for the aqueducts. Frontinus, who held the office in AD 97, wrote a treatise describing the system and the fraud of illegal taps.",
+        "Calcium carbonate deposits built up inside the channels over time, and maintenance crews had to chip away the sinter to keep the water flowing.",
+    ],
+    "bees": [
+        "Honeybees live in colonies made up of a single queen, thousands of female workers and, in summer, a few hundred male drones.",
+        "The queen is the only fertile female in the colony and can lay up to 2,000 eggs a day at the height of the season.",
+        "Workers change jobs as they age. Young bees clean cells and feed larvae, middle-aged bees build comb and guard the entrance, and the oldest bees forage for nectar and pollen.",
+        "A forager that finds a rich food source returns to the hive and performs the waggle dance. The angle of the dance relative to vertical encodes the direction of the food relative to the sun, and the duration of the waggle run encodes the distance.",
+        "Bees make honey by evaporating nectar until its water content drops below about 18 percent and by adding enzymes that break sucrose down into glucose and fructose.",
+        "Wax is secreted by glands on the underside of a worker's abdomen. Workers shape it into hexagonal cells, which hold the most honey for the least amount of wax.",
+        "When a colony grows crowded it reproduces by swarming: the old queen leaves with about half of the workers to found a new nest, and a newly raised queen takes over the original hive.",
+        "Honeybees pollinate many crops, including almonds, apples and blueberries. Almond orchards in California rent well over a million hives each spring.",
+        "The Varroa mite, a parasite that feeds on bees and spreads viruses, is considered the most serious threat to managed honeybee colonies worldwide.",
+        "In winter, workers cluster around the queen and shiver their flight muscles to keep the centre of the cluster at roughly 35 degrees Celsius.",
+    ],
+}
+
+QUESTIONS = [
+    ("solar", "How efficient are commercial silicon solar panels?", "Commercial silicon panels typically convert between 18 and 23 percent of the sunlight that reaches them into electricity."),
+    ("solar", "Why do solar installations need an inverter?", "Because panels produce direct current and the grid uses alternating current, every installation needs an inverter."),
+    ("solar", "How does heat affect panel output?", "Panel output falls as temperature rises."),
+    ("solar", "How can concentrated solar plants keep generating after sunset?", "Many plants store heat in molten salt tanks, letting them keep generating electricity for several hours after sunset."),
+    ("solar", "How much did the cost of solar modules fall between 2010 and 2020?", "The cost of solar modules fell by roughly 90 percent between 2010 and 2020"),
+    ("solar", "What output do manufacturers guarantee after 25 years?", "Most panel manufacturers guarantee that output will stay above 80 percent of the original rating after 25 years."),
+    ("coffee", "Who was Kaldi in the coffee legend?", "an Ethiopian goat herder named Kaldi noticed that his goats became energetic after eating the red berries of a certain shrub."),
+    ("coffee", "Where is the earliest credible evidence of coffee drinking?", "The earliest credible evidence of coffee drinking comes from Sufi monasteries in Yemen in the fifteenth century"),
+    ("coffee", "Why were European coffee houses called penny universities?", "because for the price of a cup anyone could listen to debates and read newspapers."),
+    ("coffee", "How does robusta differ from arabica in caffeine?", "robusta is hardier and contains roughly twice as much caffeine."),
+    ("coffee", "What pressure is used to make espresso?", "Espresso is made by forcing hot water at about nine bars of pressure through finely ground coffee"),
+    ("coffee", "What happened to coffee plantations in Ceylon?", "Coffee leaf rust, a fungal disease, wiped out the coffee plantations of Ceylon in the 1870s"),
+    ("aqueducts", "When was the Aqua Appia built?", "The first aqueduct serving Rome, the Aqua Appia, was built in 312 BC"),
+    ("aqueducts", "How did Roman aqueducts move water?", "Aqueducts moved water by gravity alone."),
+    ("aqueducts", "How did engineers cross valleys too deep for a bridge?", "Where a valley was too deep for a bridge, engineers built inverted siphons"),
+    ("aqueducts", "How high is the Pont du Gard?", "Its three tiers of arches stand almost 49 metres high."),
+    ("aqueducts", "What was a castellum divisorium?", "Water arrived at a distribution tank called a castellum divisorium"),
+    ("aqueducts", "Who was Frontinus?", "Frontinus, who held the office in AD 97, wrote a treatise describing the system and the fraud of illegal taps."),
+    ("bees", "How many eggs can a queen bee lay in a day?", "The queen is the only fertile female in the colony and can lay up to 2,000 eggs a day"),
+    ("bees", "What does the waggle dance communicate?", "The angle of the dance relative to vertical encodes the direction of the food relative to the sun, and the duration of the waggle run encodes the distance."),
+    ("bees", "How do bees turn nectar into honey?", "Bees make honey by evaporating nectar until its water content drops below about 18 percent"),
+    ("bees", "How does a honeybee colony reproduce?", "When a colony grows crowded it reproduces by swarming"),
+    ("bees", "What is the most serious threat to managed honeybee colonies?", "The Varroa mite, a parasite that feeds on bees and spreads viruses, is considered the most serious threat to managed honeybee colonies worldwide."),
+    ("bees", "How do bees keep warm in winter?", "workers cluster around the queen and shiver their flight muscles"),
+]
+
+# Sentence templates and slot fillers for the distractor documents of each topic
+DISTRACTOR_TEMPLATES = {
+    "solar": (
+        [
+            "{site} installed {count} {panel} panels in {year}, and the operator reports {metric} of about {pct} percent.",
+            "Engineers at {site} compared {panel} modules with {panel} modules and found the difference in {metric} was small.",
+            "The {part} on the roof of {site} was replaced in {year} after its {metric} dropped below {pct} percent.",
+            "In {place}, {panel} panels are usually mounted at a tilt of {angle} degrees to balance summer and winter output.",
+            "A survey of {count} rooftop systems in {place} found that dust and bird droppings reduced {metric} by up to {pct} percent.",
+            "Some installers in {place} pair every {panel} array with a {part} and a battery sized for {hours} hours of evening demand.",
+            "The solar farm near {place} covers {count} hectares and feeds its electricity into a regional substation.",
+            "Grid operators in {place} curtail solar output at midday when demand is low, wasting roughly {pct} percent of the energy.",
+            "Tracking mounts at {site} turn the panels to follow the sun, raising yearly output by about {pct} percent.",
+            "A {part} failure at {site} in {year} took the whole array offline for {hours} hours.",
+        ],
+        {
+            "site": ["the Riverside depot", "a school in Leeds", "the Almeria test field", "a dairy farm in Bavaria", "the municipal pool", "a warehouse in Ohio", "the airport car park", "a hospital in Perth"],
+            "panel": ["monocrystalline", "polycrystalline", "thin-film", "bifacial", "perovskite", "cadmium telluride"],
+            "part": ["string inverter", "charge controller", "junction box", "microinverter", "battery inverter", "combiner box"],
+            "metric": ["capacity factor", "module efficiency", "performance ratio", "inverter efficiency", "yearly yield"],
+            "place": ["Spain", "Arizona", "Queensland", "northern Chile", "Bavaria", "Rajasthan", "Ontario", "Morocco"],
+            "count": ["12", "40", "150", "600", "2,400", "18,000"],
+            "year": ["2009", "2013", "2016", "2018", "2021", "2023"],
+            "pct": ["3", "7", "12", "15", "21", "26", "31"],
+            "angle": ["15", "25", "30", "35", "40"],
+            "hours": ["2", "4", "6", "8"],
+        },
+    ),
+    "coffee": (
+        [
+            "Growers in {place} pick {species} cherries by hand between {month} and {month2}, when the fruit turns deep red.",
+            "A {roast} roast of {place} beans brings out notes of {note} and {note2}, according to the tasters at {cafe}.",
+            "{cafe} serves its {drink} with beans from {place}, ground just before brewing.",
+            "In {year} the coffee harvest in {place} fell by {pct} percent after an unusually {weather} season.",
+            "The {process} process leaves the fruit on the bean while it dries, giving the cup a flavour of {note}.",
+            "Baristas at {cafe} adjust the grind every morning so that a {drink} takes about {seconds} seconds to pour.",
+            "Farmers in {place} shade their {species} trees with banana plants, which also protects the soil from {weather} weather.",
+            "Exporters in {place} grade green beans by size and count defects in a sample of {count} grams.",
+            "Cold brew is steeped for {hours} hours in cold water, producing a smooth drink with less acidity than a {drink}.",
+            "A cooperative in {place} sold {count} bags of {species} coffee to roasters in {year}.",
+        ],
+        {
+            "place": ["Colombia", "Kenya", "Guatemala", "Sumatra", "Honduras", "Ethiopia", "Peru", "Costa Rica", "Uganda"],
+            "species": ["arabica", "robusta", "liberica", "excelsa"],
+            "roast": ["light", "medium", "dark", "city", "French"],
+            "note": ["chocolate", "citrus", "blueberry", "caramel", "jasmine", "toasted nuts", "black tea"],
+            "note2": ["brown sugar", "stone fruit", "cocoa", "honey", "red apple"],
+            "cafe": ["the Harbour Roastery", "Cafe Lumen", "the corner bakery", "Bean and Leaf", "the station kiosk"],
+            "drink": ["flat white", "cappuccino", "pour-over", "cortado", "filter coffee", "latte"],
+            "process": ["natural", "honey", "washed", "wet-hulled"],
+            "weather": ["dry", "wet", "cold", "hot", "windy"],
+            "month": ["October", "November", "March", "April"],
+            "month2": ["January", "February", "June", "July"],
+            "year": ["1994", "2001", "2008", "2014", "2019", "2022"],
+            "pct": ["5", "9", "14", "22", "30"],
+            "seconds": ["25", "28", "30", "35"],
+            "hours": ["12", "16", "20", "24"],
+            "count": ["300", "350", "1,200", "8,000"],
+        },
+    ),
+    "aqueducts": (
+        [
+            "The aqueduct of {city} drew its water from springs {km} kilometres away in the {hills}.",
+            "Archaeologists excavating near {city} in {year} found a section of {material} channel lined with waterproof mortar.",
+            "Under {emperor}, the water supply of {city} was extended with a new branch feeding the {building}.",
+            "The channel at {city} falls about {cm} centimetres per kilometre over its final stretch.",
+            "Surveyors used a {tool} to set out the course of the aqueduct across the {hills}.",
+            "A bridge of {count} arches carried the water of {city} over a {valley}, and part of it still stands.",
+            "The {building} at {city} received a share of the supply through {material} pipes stamped with the emperor's name.",
+            "Inscriptions from {city} record repairs to the aqueduct after an earthquake in AD {ad}.",
+            "Settling tanks along the route at {city} let sand and gravel sink before the water reached the {building}.",
+            "Medieval builders at {city} reused stone from the aqueduct for churches and town walls.",
+        ],
+        {
+            "city": ["Segovia", "Carthage", "Lyon", "Caesarea", "Tarragona", "Cologne", "Aspendos", "Merida", "Constantinople"],
+            "hills": ["Sabine hills", "Alban hills", "Atlas foothills", "Eifel uplands", "Taurus foothills", "Guadarrama range"],
+            "material": ["lead", "terracotta", "stone", "concrete", "brick"],
+            "emperor": ["Augustus", "Claudius", "Trajan", "Hadrian", "Septimius Severus", "Valens"],
+            "building": ["public baths", "forum fountains", "amphitheatre", "imperial palace", "market hall"],
+            "tool": ["chorobates", "groma", "dioptra"],
+            "valley": ["dry ravine", "river valley", "marshy plain", "gorge"],
+            "year": ["1887", "1932", "1965", "1998", "2011"],
+            "km": ["14", "27", "45", "90", "132"],
+            "cm": ["20", "30", "50", "70", "120"],
+            "count": ["28", "44", "75", "167"],
+            "ad": ["62", "115", "262", "365"],
+        },
+    ),
+    "bees": (
+        [
+            "Beekeepers in {place} inspect their hives every {days} days during the {season} to look for queen cells.",
+            "A {species} colony near {place} produced {kg} kilograms of honey from {flower} in a single season.",
+            "Researchers in {place} fitted {count} foragers with tiny tags to follow their flights to patches of {flower}.",
+            "{species} workers guarding the entrance inspect every returning bee by smell before letting it in.",
+            "In {season} the colony raises far fewer drones, and workers push the remaining drones out of the hive.",
+            "Bumblebees and solitary bees also pollinate {flower}, sometimes more efficiently than honeybees.",
+            "Treating hives for mites with {treatment} in late {season} helped beekeepers in {place} lose fewer colonies.",
+            "Propolis, a resin collected from {tree} buds, is used by workers to seal gaps in the hive.",
+            "Honey from {flower} crystallises within {days} days because of its high glucose content.",
+            "A beekeeping association in {place} recorded winter losses of {pct} percent in {year}.",
+        ],
+        {
+            "place": ["Slovenia", "New Zealand", "Kenya", "Oregon", "Wales", "Ontario", "Tasmania", "Andalusia"],
+            "species": ["Carniolan", "Italian", "Buckfast", "Africanised", "Caucasian"],
+            "season": ["spring", "summer", "autumn", "winter"],
+            "flower": ["clover", "heather", "lavender", "manuka", "rapeseed", "sunflowers", "acacia", "lime trees"],
+            "treatment": ["oxalic acid", "formic acid", "thymol strips", "drone brood removal"],
+            "tree": ["poplar", "birch", "pine", "willow"],
+            "days": ["5", "7", "10", "14", "21"],
+            "kg": ["18", "25", "40", "60"],
+            "count": ["50", "120", "400", "1,000"],
+            "pct": ["9", "16", "24", "33"],
+            "year": ["2007", "2012", "2017", "2020", "2024"],
+        },
+    ),
+}
+
+
+# Function to generate one distractor document from a topic's templates
+def distractor_document(topic, rng):
+    templates, slots = DISTRACTOR_TEMPLATES[topic]
+    sentences = []
+    for _ in range(rng.randint(*DISTRACTOR_SENTENCES)):
+        sentence = rng.choice(templates)
+        sentence = sentence.format(**{name: rng.choice(values) for name, values in slots.items()})
+        sentences.append(sentence[0].upper() + sentence[1:])
+    return " ".join(sentences)
+
+
+def main():
+    documents = [{"id": doc_id, "text": " ".join(paragraphs)} for doc_id, paragraphs in DOCUMENTS.items()]
+    rng = random.Random(SEED)
+    for topic in DISTRACTOR_TEMPLATES:
+        for i in range(DISTRACTORS_PER_TOPIC):
+            documents.append({"id": f"{topic}-distractor-{i}", "text": distractor_document(topic, rng)})
+    texts = {doc["id"]: doc["text"] for doc in documents}
+    questions = []
+    for doc_id, question, passage in QUESTIONS:
+        assert passage in texts[doc_id], f"passage not found in {doc_id}: {passage}"
+        questions.append({"question": question, "document": doc_id, "passage": passage})
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sweep_corpus.json")
+    with open(path, "w") as f:
+        json.dump({"documents": documents, "questions": questions}, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+    size_kb = sum(len(doc["text"]) for doc in documents) / 1024
+    print(f"Wrote {len(documents)} documents ({size_kb:.0f} KB) and {len(questions)} questions to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+from typing import Any, List, Optional
+
+import google.api_core.exceptions
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatResult
+from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_google_genai.chat_models import ChatGoogleGenerativeAIError, _response_to_result
+
+
+class SingleAttemptGemini(ChatGoogleGenerativeAI):
+    """Gemini chat model that sends exactly one request per call.
+
+    The pinned client retries every GoogleAPIError up to 10 times with
+    1-60 s waits, and its gapic transport retries ServiceUnavailable for
+    up to another 60 s. ResilientCaller is meant to be the only retry
+    layer, so this sends one request with the transport retry disabled and
+    a timeout, letting failures reach the caller's backoff and circuit
+    breaker straight away.
+    """
+
+    # Per-request timeout in seconds; None keeps the transport default
+    request_timeout: Optional[float] = None
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        params, chat, message = self._prepare_chat(messages, stop=stop, **kwargs)
+        request_options = {"retry": None}
+        if self.request_timeout is not None:
+            request_options["timeout"] = self.request_timeout
+        try:
+            response = chat.model.generate_content(
+                contents=[*chat.history, message],
+                request_options=request_options,
+                **params,
+            )
+        except google.api_core.exceptions.InvalidArgument as e:
+            raise ChatGoogleGenerativeAIError(f"Invalid argument provided to Gemini: {e}") from e
+        return _response_to_result(response)
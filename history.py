@@ -0,0 +1,148 @@
+import os
+import time
+import uuid
+import sqlite3
+import weakref
+import threading
+from collections import deque
+
+DEFAULT_HISTORY_DIR = os.path.join(".cache", "history")
+# Spill files untouched for this long are left over from a crashed process
+STALE_FILE_SECONDS = 24 * 60 * 60
+_swept_dirs = set()
+
+
+# Function to close a history's connection and delete its spill file
+def _discard(store, path):
+    if store["conn"] is not None:
+        store["conn"].close()
+        store["conn"] = None
+    if path != ":memory:" and os.path.exists(path):
+        os.remove(path)
+
+
+# Function to delete spill files that no live process has touched recently
+def sweep_stale_files(directory, max_age=STALE_FILE_SECONDS):
+    if not os.path.isdir(directory):
+        return 0
+    cutoff = time.time() - max_age
+    removed = 0
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        try:
+            if name.endswith(".sqlite") and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except OSError:
+            # Another process removed it first
+            pass
+    return removed
+
+
+class ChatHistory:
+    """Chat messages with a bounded in-memory window.
+
+    The newest ``window`` messages live in memory; older ones are spilled to
+    a SQLite file and read back only when a caller asks for them. Messages
+    are dicts with "role" and "content", as in Streamlit's chat examples.
+
+    The file is created on the first spill and deleted when the history is
+    closed, garbage collected (e.g. when Streamlit drops the session) or the
+    interpreter exits.
+    """
+
+    def __init__(self, path=":memory:", window=200):
+        """Store spilled messages at path, keeping `window` messages in memory"""
+        self.path = path
+        self.window = max(1, int(window))
+        self._recent = deque()
+        self._spilled = 0
+        self._lock = threading.Lock()
+        # Held outside self so the finalizer can reach the connection without keeping self alive
+        self._store = {"conn": None}
+        self._finalizer = weakref.finalize(self, _discard, self._store, path)
+
+    # Open the spill file; called with the lock held on the first spill
+    def _connect(self):
+        if self._store["conn"] is None:
+            if self.path != ":memory:" and os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS messages (seq INTEGER PRIMARY KEY, role TEXT NOT NULL, content TEXT NOT NULL)"
+            )
+            self._store["conn"] = conn
+        return self._store["conn"]
+
+    @classmethod
+    def for_session(cls, window=None):
+        """Create a history that spills to a fresh file in CHAT_HISTORY_DIR."""
+        directory = os.getenv("CHAT_HISTORY_DIR", DEFAULT_HISTORY_DIR)
+        if directory not in _swept_dirs:
+            _swept_dirs.add(directory)
+            sweep_stale_files(directory)
+        window = window or int(os.getenv("CHAT_HISTORY_WINDOW", "200"))
+        return cls(os.path.join(directory, f"{uuid.uuid4().hex}.sqlite"), window=window)
+
+    def __len__(self):
+        return self._spilled + len(self._recent)
+
+    def append(self, message):
+        """Add a message, spilling the oldest in-memory ones past the window."""
+        with self._lock:
+            self._recent.append({"role": message["role"], "content": message["content"]})
+            if len(self._recent) > self.window:
+                # Spill in blocks of half a window to keep writes infrequent
+                count = len(self._recent) - self.window // 2
+                rows = [
+                    (self._spilled + i, msg["role"], msg["content"])
+                    for i, msg in enumerate(self._recent.popleft() for _ in range(count))
+                ]
+                conn = self._connect()
+                conn.executemany("INSERT INTO messages VALUES (?, ?, ?)", rows)
+                conn.commit()
+                self._spilled += count
+
+    def slice(self, start, end):
+        """Return messages with positions in [start, end), oldest first."""
+        with self._lock:
+            total = self._spilled + len(self._recent)
+            start, end = max(0, start), min(end, total)
+            if start >= end:
+                return []
+            messages = []
+            if start < self._spilled:
+                rows = self._store["conn"].execute(
+                    "SELECT role, content FROM messages WHERE seq >= ? AND seq < ? ORDER BY seq",
+                    (start, min(end, self._spilled)),
+                )
+                messages.extend({"role": role, "content": content} for role, content in rows)
+            recent = list(self._recent)
+            messages.extend(recent[max(0, start - self._spilled):end - self._spilled])
+            return messages
+
+    def latest(self, count):
+        """Return the most recent `count` messages, oldest first."""
+        total = len(self)
+        return self.slice(total - count, total)
+
+    def __iter__(self):
+        return iter(self.slice(0, len(self)))
+
+    def clear(self):
+        """Forget every message, in memory and on disk."""
+        with self._lock:
+            self._recent.clear()
+            self._spilled = 0
+            if self._store["conn"] is not None:
+                self._store["conn"].execute("DELETE FROM messages")
+                self._store["conn"].commit()
+
+    def close(self, delete=True):
+        """Close the spill file, deleting it unless delete is False."""
+        with self._lock:
+            if delete:
+                self._finalizer()
+            elif self._finalizer.detach() and self._store["conn"] is not None:
+                self._store["conn"].close()
+                self._store["conn"] = None
@@ -0,0 +1,125 @@
+import os
+import json
+import mmap
+import shutil
+import hashlib
+import tempfile
+
+import numpy as np
+import faiss
+from langchain_core.documents import Document
+from langchain_community.vectorstores import FAISS
+
+from embeddings import get_default_embeddings
+
+INDEX_FILE = "index.faiss"
+TEXT_FILE = "chunks.bin"
+OFFSETS_FILE = "offsets.npy"
+MANIFEST_FILE = "manifest.json"
+
+# Map the flat vector codes straight from the file instead of copying them
+MMAP_FLAGS = faiss.IO_FLAG_MMAP | getattr(faiss, "IO_FLAG_MMAP_IFC", 0) | faiss.IO_FLAG_READ_ONLY
+
+
+# Content address for a set of chunks embedded with a given backend
+def shared_index_key(chunks, embedding_id):
+    digest = hashlib.sha256(str(embedding_id).encode("utf-8"))
+    for chunk in chunks:
+        digest.update(b"\0")
+        digest.update(chunk.encode("utf-8"))
+    return digest.hexdigest()
+
+# Function to save a FAISS vector store in the shared, mmap-friendly layout
+def save_shared_index(vectorstore, path, embedding_id=None):
+    index = vectorstore.index
+    texts = [
+        vectorstore.docstore.search(vectorstore.index_to_docstore_id[i]).page_content
+        for i in range(index.ntotal)
+    ]
+    encoded = [text.encode("utf-8") for text in texts]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.uint64)
+    np.cumsum([len(data) for data in encoded], out=offsets[1:])
+
+    # Write into a scratch directory and rename it into place so readers
+    # never observe a half-written index
+    parent = os.path.dirname(os.path.abspath(path))
+    os.makedirs(parent, exist_ok=True)
+    scratch = tempfile.mkdtemp(prefix=".tmp-", dir=parent)
+    try:
+        faiss.write_index(index, os.path.join(scratch, INDEX_FILE))
+        with open(os.path.join(scratch, TEXT_FILE), "wb") as f:
+            for data in encoded:
+                f.write(data)
+        np.save(os.path.join(scratch, OFFSETS_FILE), offsets)
+        with open(os.path.join(scratch, MANIFEST_FILE), "w") as f:
+            json.dump({
+                "ntotal": index.ntotal,
+                "dimension": index.d,
+                "embedding_id": embedding_id,
+                "version": shared_index_key(texts, embedding_id),
+            }, f)
+        try:
+            os.rename(scratch, path)
+        except OSError:
+            # Another worker published the same index first
+            if not os.path.exists(os.path.join(path, MANIFEST_FILE)):
+                raise
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+class SharedIndex:
+    """Read-only vector store over a memory-mapped FAISS index and chunk file.
+
+    All pages come from the OS page cache, so every process that opens the
+    same directory shares one physical copy of the vectors and chunk text.
+    """
+
+    def __init__(self, path, embeddings):
+        """Open the index stored at path; embeddings are used for queries"""
+        self.path = path
+        self.embeddings = embeddings
+        with open(os.path.join(path, MANIFEST_FILE)) as f:
+            self.manifest = json.load(f)
+        self.index_version = self.manifest["version"]
+        self.index = faiss.read_index(os.path.join(path, INDEX_FILE), MMAP_FLAGS)
+        self._offsets = np.load(os.path.join(path, OFFSETS_FILE), mmap_mode="r")
+        with open(os.path.join(path, TEXT_FILE), "rb") as f:
+            # mmap refuses empty files, which an empty index produces
+            self._text = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b""
+
+    def __len__(self):
+        return self.index.ntotal
+
+    def chunk(self, i):
+        """Return the text of chunk i."""
+        start, end = int(self._offsets[i]), int(self._offsets[i + 1])
+        return self._text[start:end].decode("utf-8")
+
+    def similarity_search_with_score(self, query, k=4):
+        """Return (Document, distance) pairs for the k nearest chunks."""
+        vector = np.asarray([self.embeddings.embed_query(query)], dtype=np.float32)
+        distances, ids = self.index.search(vector, k)
+        return [
+            (Document(page_content=self.chunk(i)), float(distance))
+            for distance, i in zip(distances[0], ids[0]) if i != -1
+        ]
+
+    def similarity_search(self, query, k=4):
+        """Return Documents for the k nearest chunks."""
+        return [doc for doc, _ in self.similarity_search_with_score(query, k)]
+
+
+# Function to open a shared index read-only
+def load_shared_index(path, embeddings=None):
+    return SharedIndex(path, embeddings or get_default_embeddings())
+
+# Function to build (if needed) and open the shared index for a set of chunks
+def publish_shared_index(chunks, root, embeddings=None):
+    embeddings = embeddings or get_default_embeddings()
+    embedding_id = getattr(embeddings, "backend_id", type(embeddings).__name__)
+    path = os.path.join(root, shared_index_key(chunks, embedding_id))
+    if not os.path.exists(os.path.join(path, MANIFEST_FILE)):
+        vectorstore = FAISS.from_texts(texts=chunks, embedding=embeddings)
+        save_shared_index(vectorstore, path, embedding_id)
+    return SharedIndex(path, embeddings)
@@ -0,0 +1,42 @@
+import threading
+from collections import deque
+
+
+class LatencyRecorder:
+    """Thread-safe rolling window of latency samples in milliseconds"""
+
+    def __init__(self, name, window=1000):
+        """Keep the most recent `window` samples under the given name"""
+        self.name = name
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def record(self, ms):
+        """Add one latency sample."""
+        with self._lock:
+            self._samples.append(ms)
+            self.count += 1
+
+    def percentile(self, q):
+        """Return the q-th percentile (nearest rank) of recent samples, or None."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        rank = max(1, -(-len(samples) * q // 100))
+        return samples[int(rank) - 1]
+
+    def summary(self):
+        """Return sample count and p50/p95/p99 latencies."""
+        return {
+            "count": self.count,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+        }
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self.count = 0
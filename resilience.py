@@ -0,0 +1,189 @@
+import time
+import random
+import threading
+
+from metrics import LatencyRecorder
+
+# Upstream errors worth retrying, matched by class name so the Google client
+# libraries do not need to be imported here
+RETRYABLE_ERROR_NAMES = frozenset({
+    "ResourceExhausted", "ServiceUnavailable", "DeadlineExceeded", "InternalServerError",
+    "TooManyRequests", "GatewayTimeout", "BadGateway", "Aborted",
+})
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised without calling upstream while the circuit breaker is open"""
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when an answer could not be produced within its deadline"""
+
+
+# Whether an exception is a transient upstream failure
+def is_retryable(error):
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    return any(cls.__name__ in RETRYABLE_ERROR_NAMES for cls in type(error).__mro__)
+
+
+class CircuitBreaker:
+    """Fail fast after repeated upstream failures, probing again after a cool-down.
+
+    Closed: calls flow. Open: calls are rejected until ``reset_timeout``
+    has passed. Half-open: a single probe call decides whether to close
+    the circuit again or re-open it.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        """Open after failure_threshold consecutive failures, for reset_timeout seconds"""
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._probe_owner = None
+        self.rejected = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._opened_at is None:
+            return "closed"
+        if self._clock() - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self):
+        """Return True if a call may go upstream now."""
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._probing:
+                self._probing = True
+                self._probe_owner = threading.get_ident()
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+            self._probing = False
+
+    def release(self):
+        """Free the half-open probe slot if this thread holds it and recorded nothing."""
+        with self._lock:
+            if self._probing and self._probe_owner == threading.get_ident():
+                self._probing = False
+
+
+class ResilientCaller:
+    """Call an unreliable upstream with a deadline, jittered retries and a circuit breaker"""
+
+    def __init__(self, deadline=30.0, max_attempts=3, base_delay=0.5, max_delay=8.0,
+                 breaker=None, sleep=time.sleep):
+        """Configure the default per-answer deadline (seconds) and retry policy"""
+        self.deadline = deadline
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker or CircuitBreaker()
+        self._sleep = sleep
+        self.latency = LatencyRecorder("llm")
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.timeouts = 0
+        self.failures = 0
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    # Run fn on a daemon thread so a hung upstream call cannot outlive the deadline
+    def _run(self, fn, timeout):
+        outcome = {}
+        done = threading.Event()
+
+        def target():
+            try:
+                outcome["result"] = fn()
+            except BaseException as e:
+                outcome["error"] = e
+            finally:
+                done.set()
+
+        threading.Thread(target=target, daemon=True).start()
+        if not done.wait(timeout):
+            raise DeadlineExceeded(f"Upstream call did not finish within {timeout:.1f}s")
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome["result"]
+
+    def call(self, fn, deadline=None):
+        """Return fn(), retrying retryable errors until the deadline (seconds) passes."""
+        deadline = self.deadline if deadline is None else deadline
+        start = time.monotonic()
+        end = start + deadline
+        attempted = False
+        try:
+            for attempt in range(self.max_attempts):
+                if not self.breaker.allow():
+                    raise CircuitOpenError("The language model is temporarily unavailable; please try again shortly")
+                attempted = True
+                remaining = end - time.monotonic()
+                try:
+                    result = self._run(fn, remaining)
+                except Exception as e:
+                    if isinstance(e, DeadlineExceeded):
+                        self._count("timeouts")
+                        self.breaker.record_failure()
+                        raise
+                    if not is_retryable(e):
+                        # The upstream answered, so it is healthy even if the request was bad
+                        self.breaker.record_success()
+                        raise
+                    self.breaker.record_failure()
+                    # Full jitter keeps many clients from retrying in lockstep
+                    delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+                    if attempt == self.max_attempts - 1 or time.monotonic() + delay >= end:
+                        self._count("failures")
+                        raise
+                    self._count("retries")
+                    self._sleep(delay)
+                else:
+                    self.breaker.record_success()
+                    return result
+                finally:
+                    # Never leave the circuit stuck half-open, whatever escaped
+                    self.breaker.release()
+        finally:
+            # Failed answers are sampled too, or the tail would hide the slowest ones;
+            # calls rejected by an open circuit never reached upstream and are left out
+            if attempted:
+                self.latency.record((time.monotonic() - start) * 1000)
+
+    def stats(self):
+        """Return tail latency, retry counts and the breaker state."""
+        with self._lock:
+            counts = {"retries": self.retries, "timeouts": self.timeouts, "failures": self.failures}
+        return {
+            **self.latency.summary(),
+            **counts,
+            "breaker_state": self.breaker.state,
+            "rejected": self.breaker.rejected,
+        }
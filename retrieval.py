@@ -0,0 +1,96 @@
+import re
+import time
+import threading
+
+import numpy as np
+
+from metrics import LatencyRecorder
+
+TOKEN_RE = re.compile(r"\w+")
+STOPWORDS = frozenset("""
+a an and are as at be by can do does for from has have how i in is it its of on or
+so that the their there these this to was what when where which who why will with you
+""".split())
+
+# Rerank cost across all queries in this process
+RERANK_LATENCY = LatencyRecorder("rerank")
+_fallback_lock = threading.Lock()
+_fallbacks = 0
+
+
+# Lowercased word tokens of a text
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+# Function to score candidate texts against a query with cheap lexical features
+def rerank_scores(query, texts, deadline=None, lexical_weight=1.0, phrase_weight=0.5, position_weight=0.3):
+    """Return one score per text, or None if the deadline passes first.
+
+    Scores combine query-term coverage, matched query bigrams (phrase
+    proximity) and a prior that favours the first-stage rank.
+    """
+    n = len(texts)
+    prior = 1.0 / np.log2(np.arange(n) + 2.0)
+    query_tokens = tokenize(query)
+    terms = list(dict.fromkeys(t for t in query_tokens if t not in STOPWORDS)) or list(dict.fromkeys(query_tokens))
+    if not terms:
+        return position_weight * prior
+    vocab = {term: i for i, term in enumerate(terms)}
+    v = len(vocab)
+
+    # Map every candidate token to a query-term id (-1 for everything else)
+    doc_ids = []
+    for text in texts:
+        tokens = tokenize(text)
+        doc_ids.append(np.fromiter((vocab.get(t, -1) for t in tokens), dtype=np.int64, count=len(tokens)))
+        if deadline is not None and time.perf_counter() > deadline:
+            return None
+    lengths = np.fromiter((len(ids) for ids in doc_ids), dtype=np.int64, count=n)
+    ids = np.concatenate(doc_ids) if n else np.zeros(0, dtype=np.int64)
+    owner = np.repeat(np.arange(n), lengths)
+
+    # Lexical overlap: fraction of query terms present in each candidate
+    hit = ids >= 0
+    counts = np.bincount(owner[hit] * v + ids[hit], minlength=n * v).reshape(n, v)
+    lexical = (counts > 0).sum(axis=1) / v
+
+    # Phrase proximity: fraction of query bigrams appearing verbatim
+    query_pairs = {
+        vocab[a] * v + vocab[b]
+        for a, b in zip(query_tokens, query_tokens[1:]) if a in vocab and b in vocab
+    }
+    phrase = np.zeros(n)
+    if query_pairs and len(ids) > 1:
+        same_doc = owner[:-1] == owner[1:]
+        pairs = np.where(same_doc & hit[:-1] & hit[1:], ids[:-1] * v + ids[1:], -1)
+        matched = np.isin(pairs, list(query_pairs))
+        # Count each distinct bigram once per candidate
+        unique = np.unique(owner[:-1][matched] * (v * v) + pairs[matched])
+        phrase = np.bincount(unique // (v * v), minlength=n) / len(query_pairs)
+
+    if deadline is not None and time.perf_counter() > deadline:
+        return None
+    return lexical_weight * lexical + phrase_weight * phrase + position_weight * prior
+
+# Function to retrieve k chunks: over-fetch from the index, then rerank within a time budget
+def retrieve(vectorstore, query, k=4, fetch_k=50, budget_ms=25):
+    global _fallbacks
+    candidates = vectorstore.similarity_search(query, k=max(k, fetch_k))
+    if len(candidates) <= 1:
+        return candidates[:k]
+    start = time.perf_counter()
+    scores = rerank_scores(query, [doc.page_content for doc in candidates], deadline=start + budget_ms / 1000)
+    RERANK_LATENCY.record((time.perf_counter() - start) * 1000)
+    if scores is None:
+        # Over budget: keep the first-stage order
+        with _fallback_lock:
+            _fallbacks += 1
+        return candidates[:k]
+    order = np.argsort(-scores, kind="stable")[:k]
+    return [candidates[i] for i in order]
+
+# Function to report rerank cost percentiles and budget fallbacks
+def get_retrieval_stats():
+    with _fallback_lock:
+        fallbacks = _fallbacks
+    return {**RERANK_LATENCY.summary(), "fallbacks": fallbacks}
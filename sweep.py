@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""Sweep retrieval parameters over a labeled corpus and print a Pareto table.
+
+For each combination of chunk size, chunk overlap, embedding dimension, k
+and fetch_k, the harness builds an index over the corpus and asks every
+labeled question. It reports index build time, measured index memory
+(vectors, chunk text and LangChain's docstore), retrieval latency
+percentiles, recall@k and prompt size.
+
+A question counts as recalled when one retrieved chunk from the labeled
+document contains at least 80% of the passage's words, so passages cut by
+a chunk boundary can still match. Every question is asked `repeats` times
+and latencies within 10% of each other count as ties on the Pareto front,
+so timer noise does not decide which configurations survive.
+
+    python sweep.py --chunk-sizes 500 1000 --overlaps 0 100 --k 2 4 8
+"""
+
+import gc
+import os
+import sys
+import csv
+import json
+import time
+import tracemalloc
+import argparse
+import itertools
+
+from embeddings import SimpleEmbeddings, SentenceTransformerEmbeddings
+from metrics import LatencyRecorder
+from retrieval import retrieve, tokenize
+from utils import split_text_into_chunks, create_vectorstore, RAG_PROMPT_TEMPLATE
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "sweep_corpus.json")
+PASSAGE_COVERAGE = 0.8
+# Relative p95 difference below which two configurations are equally fast
+LATENCY_TOLERANCE = 0.1
+
+# Columns shown in the table, with the direction that counts as better
+OBJECTIVES = {"recall": max, "p95_ms": min, "prompt_chars": min, "index_kb": min}
+
+
+def load_corpus(path=DEFAULT_CORPUS):
+    with open(path) as f:
+        return json.load(f)
+
+
+# Whether a retrieved chunk covers enough of the labeled passage
+def passage_recalled(passage, chunks):
+    words = set(tokenize(passage))
+    return any(len(words & set(tokenize(chunk))) >= PASSAGE_COVERAGE * len(words) for chunk in chunks)
+
+
+def _embeddings(backend, dimension):
+    if backend == "hashing":
+        return SimpleEmbeddings(size=dimension)
+    return SentenceTransformerEmbeddings(backend)
+
+
+def build_index(corpus, chunk_size, chunk_overlap, embeddings):
+    """Split and embed the corpus, returning (vectorstore, chunks, sources, seconds).
+
+    sources maps each chunk's text to the ids of the documents it came from.
+    """
+    start = time.perf_counter()
+    chunks = []
+    sources = {}
+    for document in corpus["documents"]:
+        for chunk in split_text_into_chunks(document["text"], chunk_size=chunk_size, chunk_overlap=chunk_overlap):
+            chunks.append(chunk)
+            sources.setdefault(chunk, set()).add(document.get("id"))
+    vectorstore = create_vectorstore(chunks, embeddings=embeddings)
+    return vectorstore, chunks, sources, time.perf_counter() - start
+
+
+def index_memory_bytes(vectorstore, chunks):
+    """Return the bytes a LangChain FAISS store over chunks occupies.
+
+    The docstore, Documents and id maps are measured with tracemalloc while
+    an identical store is rebuilt from the already computed vectors, so the
+    embedder does not run under tracing. FAISS keeps its vectors in C++
+    memory that tracemalloc cannot see, so its code buffer is added, along
+    with the chunk strings the Documents share.
+    """
+    from langchain_community.vectorstores import FAISS
+    index = vectorstore.index
+    text_embeddings = list(zip(chunks, index.reconstruct_n(0, index.ntotal)))
+    gc.collect()
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    store = FAISS.from_embeddings(text_embeddings, vectorstore.embedding_function)
+    python_bytes = tracemalloc.get_traced_memory()[0] - before
+    if not tracing:
+        tracemalloc.stop()
+    return python_bytes + store.index.codes.size() + sum(sys.getsizeof(chunk) for chunk in chunks)
+
+
+def evaluate(corpus, vectorstore, sources, k, fetch_k, budget_ms=25, repeats=1):
+    """Ask every labeled question `repeats` times and return latency, recall and prompt size."""
+    count = len(corpus["questions"])
+    latency = LatencyRecorder("sweep", window=count * repeats)
+    for _ in range(repeats - 1):
+        for item in corpus["questions"]:
+            start = time.perf_counter()
+            retrieve(vectorstore, item["question"], k=k, fetch_k=fetch_k, budget_ms=budget_ms)
+            latency.record((time.perf_counter() - start) * 1000)
+    hits = 0
+    prompt_chars = 0
+    for item in corpus["questions"]:
+        start = time.perf_counter()
+        docs = retrieve(vectorstore, item["question"], k=k, fetch_k=fetch_k, budget_ms=budget_ms)
+        latency.record((time.perf_counter() - start) * 1000)
+        texts = [doc.page_content for doc in docs]
+        # Distractors may repeat the passage's vocabulary; only its own document counts
+        relevant = [text for text in texts if item["document"] in sources.get(text, ())]
+        hits += passage_recalled(item["passage"], relevant)
+        prompt_chars += len(RAG_PROMPT_TEMPLATE.format(context="\n".join(texts), question=item["question"]))
+    summary = latency.summary()
+    return {
+        "p50_ms": summary["p50_ms"],
+        "p95_ms": summary["p95_ms"],
+        "recall": hits / count,
+        "prompt_chars": prompt_chars / count,
+    }
+
+
+def run_sweep(corpus, chunk_sizes, overlaps, dimensions, ks, fetch_ks, backend="hashing", repeats=5):
+    """Return one result row per valid parameter combination."""
+    rows = []
+    # Load the lazily imported splitter and FAISS before anything is timed
+    build_index({"documents": [{"text": "warm up"}]}, 100, 0, SimpleEmbeddings(size=8))
+    for chunk_size, overlap, dimension in itertools.product(chunk_sizes, overlaps, dimensions):
+        if overlap >= chunk_size:
+            continue
+        embeddings = _embeddings(backend, dimension)
+        vectorstore, chunks, sources, build_seconds = build_index(corpus, chunk_size, overlap, embeddings)
+        index_bytes = index_memory_bytes(vectorstore, chunks)
+        # k and fetch_k only affect querying, so the index is reused for them
+        for k, fetch_k in itertools.product(ks, fetch_ks):
+            if fetch_k < k:
+                continue
+            rows.append({
+                "chunk_size": chunk_size,
+                "overlap": overlap,
+                "dimension": vectorstore.index.d,
+                "k": k,
+                "fetch_k": fetch_k,
+                "chunks": len(chunks),
+                "build_ms": build_seconds * 1000,
+                "index_kb": index_bytes / 1024,
+                **evaluate(corpus, vectorstore, sources, k, fetch_k, repeats=repeats),
+            })
+    return rows
+
+
+# Whether value a beats value b on a column, treating close latencies as ties
+def _better(col, a, b, tolerance):
+    if OBJECTIVES[col] is max:
+        return a > b
+    if col == "p95_ms":
+        return a * (1 + tolerance) < b
+    return a < b
+
+
+def _dominates(a, b, tolerance=LATENCY_TOLERANCE):
+    no_worse = all(not _better(col, b[col], a[col], tolerance) for col in OBJECTIVES)
+    return no_worse and any(_better(col, a[col], b[col], tolerance) for col in OBJECTIVES)
+
+
+def pareto_front(rows, latency_tolerance=LATENCY_TOLERANCE):
+    """Return the rows no other row beats on every objective, best recall first."""
+    front = [row for row in rows if not any(_dominates(other, row, latency_tolerance) for other in rows)]
+    return sorted(front, key=lambda row: (-row["recall"], row["p95_ms"], row["prompt_chars"]))
+
+
+def format_table(rows):
+    """Render rows as a Markdown table."""
+    columns = [
+        ("chunk_size", "{}"), ("overlap", "{}"), ("dimension", "{}"), ("k", "{}"), ("fetch_k", "{}"),
+        ("chunks", "{}"), ("build_ms", "{:.1f}"), ("index_kb", "{:.0f}"), ("p50_ms", "{:.2f}"),
+        ("p95_ms", "{:.2f}"), ("recall", "{:.2f}"), ("prompt_chars", "{:.0f}"),
+    ]
+    lines = [
+        "| " + " | ".join(name for name, _ in columns) + " |",
+        "|" + "|".join("---:" for _ in columns) + "|",
+    ]
+    for row in rows:
+        lines.append("| " + " | ".join(fmt.format(row[name]) for name, fmt in columns) + " |")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="JSON file with documents and labeled questions")
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[250, 500, 1000, 2000])
+    parser.add_argument("--overlaps", type=int, nargs="+", default=[0, 100, 200])
+    parser.add_argument("--dimensions", type=int, nargs="+", default=[128, 384, 768])
+    parser.add_argument("--k", type=int, nargs="+", default=[2, 4, 8])
+    parser.add_argument("--fetch-k", type=int, nargs="+", default=[10, 50])
+    parser.add_argument("--backend", default="hashing", help="'hashing' or a sentence-transformers model name")
+    parser.add_argument("--repeats", type=int, default=5, help="times each question is asked per configuration")
+    parser.add_argument("--all", action="store_true", help="print every configuration, not just the Pareto front")
+    parser.add_argument("--csv", help="also write every configuration to this CSV file")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    dimensions = args.dimensions if args.backend == "hashing" else [None]
+    rows = run_sweep(corpus, args.chunk_sizes, args.overlaps, dimensions, args.k, args.fetch_k, args.backend, args.repeats)
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+
+    front = pareto_front(rows)
+    size_kb = sum(len(document["text"]) for document in corpus["documents"]) / 1024
+    print(f"{len(rows)} configurations, {len(front)} on the Pareto front "
+          f"({len(corpus['questions'])} questions x {args.repeats}, {len(corpus['documents'])} documents, {size_kb:.0f} KB)\n")
+    print(format_table(rows if args.all else front))
+
+
+if __name__ == "__main__":
+    main()
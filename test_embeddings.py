@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+import numpy as np
+from embeddings import SimpleEmbeddings, EmbeddingBackend, EmbeddingCache, CachedEmbeddings, text_digest
+from utils import create_vectorstore
+
+
+def test_hashing_embeddings_are_deterministic():
+    first = SimpleEmbeddings(size=32).embed_documents(["alpha", "beta"])
+    second = SimpleEmbeddings(size=32, batch_size=1, workers=4).embed_documents(["alpha", "beta"])
+    assert len(first) == 2 and first[0].shape == (32,)
+    assert np.array_equal(first[0], second[0]) and np.array_equal(first[1], second[1])
+    assert not np.array_equal(first[0], first[1])
+
+
+def test_process_pool_matches_inline():
+    texts = [f"chunk {i}" for i in range(20)]
+    backend = SimpleEmbeddings(size=16, batch_size=3, workers=2, executor="process")
+    try:
+        pooled = backend.embed_documents(texts)
+    finally:
+        backend.close()
+    inline = SimpleEmbeddings(size=16).embed_documents(texts)
+    assert all(np.array_equal(a, b) for a, b in zip(pooled, inline))
+
+
+def test_cache_serves_repeated_texts():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cache.sqlite")
+        backend = SimpleEmbeddings(size=16)
+        embeddings = CachedEmbeddings(backend, EmbeddingCache(path))
+        vectors = embeddings.embed_documents(["a", "b", "a"])
+        assert backend.stats()["texts_embedded"] == 2
+        assert np.array_equal(vectors[0], vectors[2])
+
+        # A fresh cache on the same file sees the persisted vectors
+        reopened = CachedEmbeddings(SimpleEmbeddings(size=16), EmbeddingCache(path))
+        again = reopened.embed_documents(["a", "b"])
+        stats = reopened.stats()
+        assert stats["texts_embedded"] == 0
+        assert stats["cache_hit_rate"] == 1.0
+        assert np.array_equal(again[1], vectors[1])
+
+
+def test_cache_is_keyed_by_backend():
+    cache = EmbeddingCache(":memory:")
+    CachedEmbeddings(SimpleEmbeddings(size=8), cache).embed_documents(["x"])
+    wider = SimpleEmbeddings(size=12)
+    vector = CachedEmbeddings(wider, cache).embed_documents(["x"])[0]
+    assert vector.shape == (12,)
+    assert wider.stats()["texts_embedded"] == 1
+
+
+def test_vectorstore_with_cached_embeddings():
+    embeddings = CachedEmbeddings(SimpleEmbeddings(size=16), EmbeddingCache(":memory:"))
+    vectorstore = create_vectorstore(["first chunk", "second chunk"], embeddings=embeddings)
+    results = vectorstore.similarity_search("first chunk", k=1)
+    assert results[0].page_content == "first chunk"
+    vectorstore.similarity_search("first chunk", k=1)
+    # Query vectors bypass the cache so it only holds document chunks
+    assert embeddings.stats()["cache_hits"] == 0
+    assert embeddings.cache._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0] == 2
+
+
+def test_cache_prunes_least_recently_used_rows():
+    cache = EmbeddingCache(":memory:", max_rows=10)
+    embeddings = CachedEmbeddings(SimpleEmbeddings(size=4), cache)
+    embeddings.embed_documents([f"text {i}" for i in range(10)])
+    # Touch the oldest text so it survives the next prune
+    embeddings.embed_documents(["text 0"])
+    embeddings.embed_documents(["new text"])
+    # Pruning drops to 90% of the cap, evicting older rows first
+    rows = cache._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+    assert rows == 9
+    survivors = cache.get_many("hashing-4", [text_digest("text 0"), text_digest("new text")])
+    assert len(survivors) == 2
+
+
+def test_backend_must_implement_embed_batch():
+    class Incomplete(EmbeddingBackend):
+        backend_id = "incomplete"
+
+    try:
+        Incomplete()
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("expected TypeError for a backend without embed_batch")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing embedding backends and cache")
+    print("=" * 50)
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+import gc
+import os
+import tempfile
+from history import ChatHistory
+
+
+def _fill(history, count):
+    for i in range(count):
+        history.append({"role": "user" if i % 2 == 0 else "assistant", "content": f"message {i}"})
+
+
+def test_window_bounds_memory_and_spills_to_disk():
+    history = ChatHistory(window=10)
+    _fill(history, 95)
+    assert len(history) == 95
+    assert len(history._recent) <= 10
+    assert [m["content"] for m in history] == [f"message {i}" for i in range(95)]
+
+
+def test_latest_page_and_slices_across_the_spill_boundary():
+    history = ChatHistory(window=8)
+    _fill(history, 30)
+    assert [m["content"] for m in history.latest(3)] == ["message 27", "message 28", "message 29"]
+    assert [m["content"] for m in history.slice(20, 26)] == [f"message {i}" for i in range(20, 26)]
+    assert len(history.latest(100)) == 30
+    assert history.slice(40, 50) == []
+
+
+def _session_history(directory, window):
+    os.environ["CHAT_HISTORY_DIR"] = directory
+    try:
+        return ChatHistory.for_session(window=window)
+    finally:
+        del os.environ["CHAT_HISTORY_DIR"]
+
+
+def test_session_file_is_created_on_spill_and_removed_when_collected():
+    with tempfile.TemporaryDirectory() as tmp:
+        history = _session_history(tmp, window=2)
+        _fill(history, 2)
+        assert os.listdir(tmp) == []
+        _fill(history, 3)
+        assert len(os.listdir(tmp)) == 1
+        # Streamlit drops session_state when a session ends; nobody calls close()
+        del history
+        gc.collect()
+        assert os.listdir(tmp) == []
+
+
+def test_stale_session_files_are_swept_on_startup():
+    with tempfile.TemporaryDirectory() as tmp:
+        stale = os.path.join(tmp, "stale.sqlite")
+        fresh = os.path.join(tmp, "fresh.sqlite")
+        for path in (stale, fresh):
+            open(path, "w").close()
+        os.utime(stale, (0, 0))
+        _session_history(tmp, window=2)
+        assert os.listdir(tmp) == ["fresh.sqlite"]
+
+
+def test_clear():
+    history = ChatHistory(window=2)
+    _fill(history, 5)
+    history.clear()
+    assert len(history) == 0 and not history
+    _fill(history, 1)
+    assert history.latest(5) == [{"role": "user", "content": "message 0"}]
+
+
+if __name__ == "__main__":
+    print("🧪 Testing chat history store")
+    print("=" * 50)
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
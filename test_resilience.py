@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+
+import time
+import threading
+from langchain_core.runnables import RunnableLambda
+from embeddings import SimpleEmbeddings
+from resilience import CircuitBreaker, CircuitOpenError, DeadlineExceeded, ResilientCaller, is_retryable
+from utils import create_vectorstore, generate_rag_response
+
+
+class ServiceUnavailable(Exception):
+    """Mimics google.api_core.exceptions.ServiceUnavailable"""
+
+
+class FaultyLLM:
+    """Local fake LLM that plays back a script of faults before answering"""
+
+    def __init__(self, faults=(), hang=None):
+        self.faults = list(faults)
+        self.hang = hang
+        self.calls = 0
+        self._lock = threading.Lock()
+        self.runnable = RunnableLambda(lambda prompt: self())
+
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+            fault = self.faults.pop(0) if self.faults else None
+        if fault == "hang":
+            time.sleep(self.hang)
+        elif fault is not None:
+            raise fault
+        return "ok"
+
+
+class FakeGenerativeService:
+    """Stands in for the Gemini gapic client, which retries ServiceUnavailable itself unless retry=None"""
+
+    def __init__(self, faults=(), internal_attempts=5):
+        self.faults = list(faults)
+        self.internal_attempts = internal_attempts
+        self.requests = []
+
+    def generate_content(self, request, retry="default", timeout=None, **kwargs):
+        import google.ai.generativelanguage as glm
+        attempts = 1 if retry is None else self.internal_attempts
+        for attempt in range(attempts):
+            self.requests.append({"retry": retry, "timeout": timeout})
+            fault = self.faults.pop(0) if self.faults else None
+            if fault is None:
+                content = glm.Content(parts=[glm.Part(text="ok")], role="model")
+                return glm.GenerateContentResponse(candidates=[glm.Candidate(content=content, finish_reason=1)])
+            if attempt == attempts - 1:
+                raise fault
+
+
+def _gemini(service):
+    from gemini import SingleAttemptGemini
+    llm = SingleAttemptGemini(google_api_key="test", model="gemini-1.5-flash", request_timeout=5)
+    llm.client._client = service
+    return llm
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _caller(**kwargs):
+    sleeps = []
+    caller = ResilientCaller(sleep=sleeps.append, **kwargs)
+    return caller, sleeps
+
+
+def test_retries_transient_errors_with_backoff():
+    llm = FaultyLLM([ServiceUnavailable(), ConnectionError()])
+    caller, sleeps = _caller(max_attempts=3, base_delay=0.1)
+    assert caller.call(llm) == "ok"
+    assert llm.calls == 3
+    assert len(sleeps) == 2
+    assert 0 <= sleeps[0] <= 0.1 and 0 <= sleeps[1] <= 0.2
+    assert caller.stats()["retries"] == 2
+
+
+def test_non_retryable_errors_fail_immediately():
+    llm = FaultyLLM([ValueError("invalid api key")])
+    caller, sleeps = _caller()
+    try:
+        caller.call(llm)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected ValueError")
+    assert llm.calls == 1 and sleeps == []
+    assert caller.breaker.state == "closed"
+
+
+def test_gives_up_after_max_attempts():
+    llm = FaultyLLM([ServiceUnavailable()] * 5)
+    caller, _ = _caller(max_attempts=2)
+    try:
+        caller.call(llm)
+    except ServiceUnavailable:
+        pass
+    else:
+        raise AssertionError("expected ServiceUnavailable")
+    assert llm.calls == 2
+    assert caller.stats()["failures"] == 1
+
+
+def test_deadline_bounds_a_hung_call():
+    llm = FaultyLLM(["hang"], hang=2.0)
+    caller, _ = _caller()
+    start = time.monotonic()
+    try:
+        caller.call(llm, deadline=0.1)
+    except DeadlineExceeded:
+        pass
+    else:
+        raise AssertionError("expected DeadlineExceeded")
+    assert time.monotonic() - start < 1.0
+    assert caller.stats()["timeouts"] == 1
+
+
+def test_circuit_opens_then_recovers():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+    caller, _ = _caller(max_attempts=1, breaker=breaker)
+    llm = FaultyLLM([ServiceUnavailable(), ServiceUnavailable()])
+    for _ in range(2):
+        try:
+            caller.call(llm)
+        except ServiceUnavailable:
+            pass
+    assert breaker.state == "open"
+
+    # Open: fail fast without touching the upstream
+    try:
+        caller.call(llm)
+    except CircuitOpenError:
+        pass
+    else:
+        raise AssertionError("expected CircuitOpenError")
+    assert llm.calls == 2
+
+    # After the cool-down one probe goes through and closes the circuit
+    clock.now = 10
+    assert breaker.state == "half_open"
+    assert caller.call(llm) == "ok"
+    assert breaker.state == "closed"
+
+
+def test_failed_probe_reopens_circuit():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=5, clock=clock)
+    breaker.record_failure()
+    clock.now = 5
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+
+def test_non_retryable_probe_closes_circuit():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=5, clock=clock)
+    caller, _ = _caller(max_attempts=1, breaker=breaker)
+    breaker.record_failure()
+    clock.now = 5
+    llm = FaultyLLM([ValueError("bad request")])
+    try:
+        caller.call(llm)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected ValueError")
+    # The upstream answered, so the probe counts as healthy
+    assert breaker.state == "closed"
+    clock.now = 1000
+    assert caller.call(llm) == "ok"
+
+
+def test_interrupted_probe_releases_half_open_slot():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=5, clock=clock)
+    caller, _ = _caller(max_attempts=1, breaker=breaker)
+    breaker.record_failure()
+    clock.now = 5
+
+    class Interrupted(BaseException):
+        pass
+
+    def interrupted():
+        raise Interrupted()
+
+    caller._run = lambda fn, timeout: fn()
+    try:
+        caller.call(interrupted)
+    except Interrupted:
+        pass
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+
+
+def test_gemini_transient_errors_reach_the_retry_policy():
+    from google.api_core.exceptions import ServiceUnavailable as GoogleUnavailable
+    service = FakeGenerativeService([GoogleUnavailable("busy"), GoogleUnavailable("busy")])
+    llm = _gemini(service)
+    caller, sleeps = _caller(max_attempts=3)
+    assert caller.call(lambda: llm.invoke("hello").content) == "ok"
+    # One upstream request per attempt: the client's own retries are off
+    assert len(service.requests) == 3 and len(sleeps) == 2
+    assert all(r == {"retry": None, "timeout": 5} for r in service.requests)
+
+
+def test_gemini_outage_opens_the_circuit_without_waiting():
+    from google.api_core.exceptions import ServiceUnavailable as GoogleUnavailable
+    service = FakeGenerativeService([GoogleUnavailable("down")] * 100)
+    llm = _gemini(service)
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    caller, _ = _caller(max_attempts=3, breaker=breaker)
+    try:
+        caller.call(lambda: llm.invoke("hello"))
+    except GoogleUnavailable:
+        pass
+    else:
+        raise AssertionError("expected ServiceUnavailable")
+    assert len(service.requests) == 3
+    assert breaker.state == "open"
+
+
+def test_retryable_classification():
+    assert is_retryable(TimeoutError())
+    assert is_retryable(ServiceUnavailable())
+    assert not is_retryable(KeyError("x"))
+
+
+def test_generate_rag_response_enforces_deadline():
+    llm = FaultyLLM(["hang"], hang=2.0)
+    vectorstore = create_vectorstore(["Resilience test chunk."], embeddings=SimpleEmbeddings(size=16))
+    start = time.monotonic()
+    try:
+        generate_rag_response("Is this resilient?", vectorstore, llm=llm.runnable, deadline=0.2)
+    except DeadlineExceeded:
+        pass
+    else:
+        raise AssertionError("expected DeadlineExceeded")
+    assert time.monotonic() - start < 1.0
+
+
+def test_latency_is_recorded():
+    caller, _ = _caller()
+    for _ in range(5):
+        caller.call(FaultyLLM())
+    stats = caller.stats()
+    assert stats["count"] == 5
+    assert stats["p99_ms"] is not None and stats["p99_ms"] >= stats["p50_ms"]
+
+
+def test_failed_answers_are_part_of_the_latency_tail():
+    caller, _ = _caller(max_attempts=1)
+    caller.call(FaultyLLM())
+    try:
+        caller.call(FaultyLLM(["hang"], hang=2.0), deadline=0.2)
+    except DeadlineExceeded:
+        pass
+    try:
+        caller.call(FaultyLLM([ValueError("bad request")]))
+    except ValueError:
+        pass
+    stats = caller.stats()
+    assert stats["count"] == 3
+    assert stats["p99_ms"] >= 200
+
+
+if __name__ == "__main__":
+    print("🧪 Testing resilient LLM calls")
+    print("=" * 50)
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+
+from langchain_core.documents import Document
+from metrics import LatencyRecorder
+from retrieval import rerank_scores, retrieve, get_retrieval_stats
+
+
+class ListStore:
+    """Vector store stub that returns its documents in a fixed order"""
+
+    def __init__(self, texts):
+        self.docs = [Document(page_content=text) for text in texts]
+        self.requested_k = None
+
+    def similarity_search(self, query, k=4):
+        self.requested_k = k
+        return self.docs[:k]
+
+
+def test_rerank_prefers_lexical_and_phrase_matches():
+    texts = [
+        "unrelated text about cooking pasta",
+        "the solar panel efficiency figures",
+        "solar energy and panel efficiency are discussed here",
+        "panel",
+    ]
+    scores = rerank_scores("What is solar panel efficiency?", texts)
+    assert scores.argmax() == 1
+    assert scores[2] > scores[3] > scores[0]
+
+
+def test_retrieve_over_fetches_and_truncates():
+    store = ListStore([f"filler {i}" for i in range(60)] + ["needle phrase here"])
+    store.docs.insert(40, Document(page_content="the needle phrase"))
+    docs = retrieve(store, "needle phrase", k=2, fetch_k=50)
+    assert store.requested_k == 50
+    assert len(docs) == 2
+    assert docs[0].page_content == "the needle phrase"
+
+
+def test_budget_exceeded_falls_back_to_first_stage_order():
+    store = ListStore([f"filler {i}" for i in range(10)] + ["match me"])
+    before = get_retrieval_stats()["fallbacks"]
+    docs = retrieve(store, "match me", k=3, fetch_k=20, budget_ms=-1)
+    assert [doc.page_content for doc in docs] == ["filler 0", "filler 1", "filler 2"]
+    assert get_retrieval_stats()["fallbacks"] == before + 1
+
+
+def test_query_without_terms_keeps_order():
+    scores = rerank_scores("???", ["b", "a", "c"])
+    assert list(scores.argsort()[::-1]) == [0, 1, 2]
+
+
+def test_latency_percentiles():
+    recorder = LatencyRecorder("test")
+    assert recorder.percentile(50) is None
+    for ms in range(1, 101):
+        recorder.record(float(ms))
+    summary = recorder.summary()
+    assert summary["count"] == 100
+    assert (summary["p50_ms"], summary["p95_ms"], summary["p99_ms"]) == (50.0, 95.0, 99.0)
+
+
+if __name__ == "__main__":
+    print("🧪 Testing two-stage retrieval")
+    print("=" * 50)
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+import multiprocessing
+import faiss
+import numpy as np
+import pytest
+from embeddings import SimpleEmbeddings
+from index_store import INDEX_FILE, OFFSETS_FILE, TEXT_FILE, load_shared_index, publish_shared_index, save_shared_index
+from utils import create_vectorstore
+
+WORKERS = 4
+
+
+def test_shared_index_matches_in_memory_store():
+    chunks = [f"chunk number {i} about topic {i % 7}" for i in range(50)] + ["ünïcödé chunk"]
+    embeddings = SimpleEmbeddings(size=32)
+    vectorstore = create_vectorstore(chunks, embeddings=embeddings)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "index")
+        save_shared_index(vectorstore, path, embeddings.backend_id)
+        shared = load_shared_index(path, embeddings)
+        assert len(shared) == len(chunks)
+        assert shared.chunk(len(chunks) - 1) == "ünïcödé chunk"
+        for query in ["chunk number 3 about topic 3", "something else"]:
+            expected = [doc.page_content for doc in vectorstore.similarity_search(query, k=5)]
+            assert [doc.page_content for doc in shared.similarity_search(query, k=5)] == expected
+
+
+def test_publish_reuses_existing_index():
+    embeddings = SimpleEmbeddings(size=16)
+    with tempfile.TemporaryDirectory() as tmp:
+        first = publish_shared_index(["a", "b", "c"], tmp, embeddings)
+        calls = embeddings.stats()["texts_embedded"]
+        second = publish_shared_index(["a", "b", "c"], tmp, embeddings)
+        assert second.index_version == first.index_version
+        assert embeddings.stats()["texts_embedded"] == calls
+        assert [doc.page_content for doc in second.similarity_search("b", k=1)] == ["b"]
+
+
+# Proportional set size counts shared pages once across all processes
+def _pss_kb():
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            if line.startswith("Pss:"):
+                return int(line.split()[1])
+
+
+DIMENSION, COUNT = 768, 10000
+
+
+def _chunks():
+    return [f"chunk {i} " + "x" * 500 for i in range(COUNT)]
+
+
+def _worker(path, mode, barrier, results):
+    embeddings = SimpleEmbeddings(size=DIMENSION)
+    query = np.asarray([embeddings.embed_query("chunk 1")], dtype=np.float32)
+    # Hold on to the index and text so their memory stays resident until measured
+    if mode == "copy":
+        # The same saved files, read into private memory
+        index = faiss.read_index(os.path.join(path, INDEX_FILE))
+        offsets = np.load(os.path.join(path, OFFSETS_FILE))
+        with open(os.path.join(path, TEXT_FILE), "rb") as f:
+            data = f.read()
+        texts = [data[int(offsets[i]):int(offsets[i + 1])].decode("utf-8") for i in range(index.ntotal)]
+        del data
+        size = sum(len(text) for text in texts)
+    else:
+        store = load_shared_index(path, embeddings)
+        index = store.index
+        # Reading every chunk faults the whole text mapping in without copying it
+        size = sum(len(store.chunk(i)) for i in range(len(store)))
+    # A flat search touches every vector, so all pages are resident
+    assert index.search(query, 4)[1][0][0] != -1
+    assert index.ntotal == COUNT and size > 0
+    # Measure once every worker holds its index
+    barrier.wait()
+    results.put(_pss_kb())
+    barrier.wait()
+
+
+def _total_pss_kb(path, mode):
+    ctx = multiprocessing.get_context("spawn")
+    barrier = ctx.Barrier(WORKERS)
+    results = ctx.Queue()
+    workers = [ctx.Process(target=_worker, args=(path, mode, barrier, results)) for _ in range(WORKERS)]
+    for worker in workers:
+        worker.start()
+    total = sum(results.get(timeout=300) for _ in workers)
+    for worker in workers:
+        worker.join()
+    return total
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/smaps_rollup"), reason="needs Linux /proc smaps_rollup")
+def test_workers_share_one_copy_of_the_index():
+    chunks = _chunks()
+    embeddings = SimpleEmbeddings(size=DIMENSION)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "index")
+        save_shared_index(create_vectorstore(chunks, embeddings=embeddings), path, embeddings.backend_id)
+
+        private = _total_pss_kb(path, "copy")
+        shared = _total_pss_kb(path, "mmap")
+    data_kb = (COUNT * DIMENSION * 4 + sum(len(chunk) for chunk in chunks)) // 1024
+    print(f"   {WORKERS} workers, {data_kb} KB index: private {private} KB, mmap {shared} KB")
+    # Both modes load the same files, so the gap is the N-1 extra copies mmap avoids
+    assert private - shared > data_kb * (WORKERS - 1) * 3 // 4
+
+
+if __name__ == "__main__":
+    print("🧪 Testing shared memory-mapped indexes")
+    print("=" * 50)
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from langchain_core.runnables import RunnableLambda
+from embeddings import SimpleEmbeddings
+from singleflight import SingleFlight
+from utils import create_vectorstore, generate_rag_response
+
+THREADS = 8
+
+
+class StubLLM:
+    """Local stand-in for Gemini that counts upstream calls"""
+
+    def __init__(self, delay=0.3, error=None):
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self._lock = threading.Lock()
+        self.runnable = RunnableLambda(self._invoke)
+
+    def _invoke(self, prompt):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return f"answer #{self.calls}"
+
+
+def _ask_concurrently(question, vectorstore, llm, **kwargs):
+    barrier = threading.Barrier(THREADS)
+
+    def ask():
+        barrier.wait()
+        try:
+            return generate_rag_response(question, vectorstore, llm=llm.runnable, **kwargs)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(THREADS) as pool:
+        return list(pool.map(lambda _: ask(), range(THREADS)))
+
+
+def _vectorstore():
+    return create_vectorstore(["Cats are mammals.", "Dogs bark loudly.", "Birds can fly."], embeddings=SimpleEmbeddings(size=16))
+
+
+def test_identical_requests_share_one_upstream_call():
+    llm = StubLLM()
+    results = _ask_concurrently("What are cats?", _vectorstore(), llm)
+    assert llm.calls == 1
+    assert results == ["answer #1"] * THREADS
+
+
+def test_completed_calls_are_not_cached():
+    llm = StubLLM(delay=0)
+    vectorstore = _vectorstore()
+    generate_rag_response("What are cats?", vectorstore, llm=llm.runnable)
+    generate_rag_response("What are cats?", vectorstore, llm=llm.runnable)
+    assert llm.calls == 2
+
+
+def test_different_indexes_are_not_coalesced():
+    llm = StubLLM(delay=0.2)
+    first, second = _vectorstore(), create_vectorstore(["Other site."], embeddings=SimpleEmbeddings(size=16))
+    with ThreadPoolExecutor(2) as pool:
+        list(pool.map(lambda vs: generate_rag_response("What are cats?", vs, llm=llm.runnable), [first, second]))
+    assert llm.calls == 2
+
+
+def test_errors_propagate_to_every_waiter():
+    # Not retryable, so the upstream sees exactly one call
+    llm = StubLLM(error=ValueError("bad request"))
+    results = _ask_concurrently("Do dogs bark?", _vectorstore(), llm)
+    assert llm.calls == 1
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_waiters_time_out():
+    flight = SingleFlight()
+    release = threading.Event()
+    leader = threading.Thread(target=flight.do, args=("key", release.wait))
+    leader.start()
+    while not flight.stats()["in_flight"]:
+        time.sleep(0.01)
+    try:
+        flight.do("key", lambda: "unused", timeout=0.05)
+    except TimeoutError:
+        pass
+    else:
+        raise AssertionError("waiter should have timed out")
+    finally:
+        release.set()
+        leader.join()
+    assert flight.stats() == {"executions": 1, "coalesced": 1, "in_flight": 0}
+
+
+if __name__ == "__main__":
+    print("🧪 Testing request coalescing")
+    print("=" * 50)
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import json
+import subprocess
+
+# Cold-start budget for `import utils`, which is what app.py pays before first paint
+STARTUP_BUDGET_SECONDS = float(os.getenv("STARTUP_BUDGET_SECONDS", "1.5"))
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+PROBE = """
+import sys, time, json
+start = time.perf_counter()
+import utils
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "modules": sorted(sys.modules)}))
+"""
+
+PREWARM_PROBE = """
+import sys, json
+import utils
+utils.prewarm().join(timeout=60)
+print(json.dumps([name for name in utils.HEAVY_MODULES if name not in sys.modules]))
+"""
+
+
+def _profile_import():
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=HERE, capture_output=True, text=True, check=True,
+    )
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    # Lines look like: "import time:   self [us] |  cumulative | imported package"
+    slowest = []
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line and "cumulative" not in line:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            slowest.append((int(cumulative), name.rstrip()))
+    slowest.sort(reverse=True)
+    return report, slowest
+
+
+def test_heavy_modules_are_not_imported_at_startup():
+    from utils import HEAVY_MODULES
+    report, _ = _profile_import()
+    loaded = [name for name in HEAVY_MODULES + ("faiss", "langchain_core") if name in report["modules"]]
+    assert not loaded, f"imported eagerly: {loaded}"
+
+
+def test_startup_within_budget():
+    report, slowest = _profile_import()
+    top = "\n".join(f"   {us / 1000:8.1f} ms {name}" for us, name in slowest[:10])
+    print(f"   import utils: {report['seconds']:.3f}s (budget {STARTUP_BUDGET_SECONDS}s)")
+    assert report["seconds"] <= STARTUP_BUDGET_SECONDS, (
+        f"import utils took {report['seconds']:.3f}s, over the {STARTUP_BUDGET_SECONDS}s budget. "
+        f"Slowest imports:\n{top}"
+    )
+
+
+def test_prewarm_loads_heavy_modules():
+    # A fresh interpreter, since earlier tests may already have imported them
+    result = subprocess.run([sys.executable, "-c", PREWARM_PROBE], cwd=HERE, capture_output=True, text=True, check=True)
+    missing = json.loads(result.stdout.strip().splitlines()[-1])
+    assert not missing, f"not prewarmed: {missing}"
+
+
+if __name__ == "__main__":
+    print("🧪 Testing startup time")
+    print("=" * 50)
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+from embeddings import SimpleEmbeddings
+from sweep import build_index, index_memory_bytes, load_corpus, passage_recalled, pareto_front, run_sweep, format_table
+
+
+def test_corpus_passages_come_from_their_documents():
+    corpus = load_corpus()
+    texts = {document["id"]: document["text"] for document in corpus["documents"]}
+    assert corpus["questions"]
+    for item in corpus["questions"]:
+        assert item["passage"] in texts[item["document"]]
+
+
+def test_corpus_is_far_larger_than_what_retrieval_fetches():
+    corpus = load_corpus()
+    size = sum(len(document["text"]) for document in corpus["documents"])
+    # The sweep's widest setting fetches 50 chunks of 2000 characters
+    assert size > 5 * 50 * 2000
+    assert len(corpus["documents"]) > 10 * len({item["document"] for item in corpus["questions"]})
+
+
+def test_passage_recall_tolerates_chunk_boundaries():
+    passage = "one two three four five six seven eight nine ten"
+    assert passage_recalled(passage, ["zero one two three four five six seven eight"])
+    assert not passage_recalled(passage, ["one two three", "four five six seven eight nine ten"])
+
+
+def test_index_memory_counts_per_chunk_overhead():
+    corpus = {"documents": [{"id": "d", "text": " ".join(f"word{i}" for i in range(3000))}]}
+    vectorstore, chunks, _, _ = build_index(corpus, 100, 0, SimpleEmbeddings(size=16))
+    payload = vectorstore.index.ntotal * 16 * 4 + sum(len(chunk) for chunk in chunks)
+    # Documents, docstore entries and id maps cost far more than the raw text per small chunk
+    assert index_memory_bytes(vectorstore, chunks) > payload + 200 * len(chunks)
+
+
+def test_small_sweep_reports_every_metric():
+    rows = run_sweep(load_corpus(), chunk_sizes=[300, 1000], overlaps=[0, 500], dimensions=[32], ks=[2, 4], fetch_ks=[2, 20], repeats=2)
+    # overlap >= chunk_size and fetch_k < k are skipped
+    assert len(rows) == 3 * 3
+    for row in rows:
+        assert 0.0 <= row["recall"] <= 1.0
+        assert row["p95_ms"] >= row["p50_ms"] > 0
+        assert row["build_ms"] > 0 and row["index_kb"] > 0 and row["prompt_chars"] > 0
+    assert format_table(pareto_front(rows)).startswith("| chunk_size |")
+
+
+def test_pareto_front_drops_dominated_rows():
+    best = {"recall": 0.9, "p95_ms": 1.0, "prompt_chars": 1000, "index_kb": 10}
+    worse = {"recall": 0.8, "p95_ms": 2.0, "prompt_chars": 1000, "index_kb": 10}
+    tradeoff = {"recall": 1.0, "p95_ms": 5.0, "prompt_chars": 3000, "index_kb": 10}
+    assert pareto_front([worse, best, tradeoff]) == [tradeoff, best]
+
+
+def test_pareto_front_ignores_latency_noise():
+    best = {"recall": 0.9, "p95_ms": 1.00, "prompt_chars": 1000, "index_kb": 10}
+    # Slightly faster by chance, but worse on recall: still dominated
+    noisy = {"recall": 0.8, "p95_ms": 0.95, "prompt_chars": 1000, "index_kb": 10}
+    fast = {"recall": 0.8, "p95_ms": 0.50, "prompt_chars": 1000, "index_kb": 10}
+    assert pareto_front([noisy, best, fast]) == [best, fast]
+
+
+if __name__ == "__main__":
+    print("🧪 Testing retrieval parameter sweep")
+    print("=" * 50)
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
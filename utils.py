@@ -1,22 +1,57 @@
 import streamlit as st
-import requests
-from bs4 import BeautifulSoup
 import re
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.vectorstores import FAISS
-from langchain_core.embeddings import Embeddings
+import hashlib
 import os
-import numpy as np
+import threading
+import importlib
 from dotenv import load_dotenv
+from singleflight import SingleFlight
+from resilience import ResilientCaller, CircuitBreaker, CircuitOpenError, is_retryable
+
+# Heavy dependencies are imported by the functions that need them, keeping
+# them off the cold-start path; prewarm() loads them in the background
+HEAVY_MODULES = (
+    "requests",
+    "bs4",
+    "langchain_text_splitters",
+    "langchain_community.vectorstores.faiss",
+    "langchain_core.prompts",
+    "langchain_core.output_parsers",
+    "gemini",
+    "embeddings",
+    "index_store",
+    "retrieval",
+)
 
 # Load environment variables
 load_dotenv()
 
+# Function to import the heavy dependencies on a background thread
+_prewarm_lock = threading.Lock()
+_prewarm_thread = None
+
+def prewarm():
+    global _prewarm_thread
+    with _prewarm_lock:
+        if _prewarm_thread is None:
+            def load():
+                for name in HEAVY_MODULES:
+                    importlib.import_module(name)
+            _prewarm_thread = threading.Thread(target=load, name="prewarm-imports", daemon=True)
+            _prewarm_thread.start()
+    return _prewarm_thread
+
+# Keep `from utils import SimpleEmbeddings` working without an eager import
+def __getattr__(name):
+    if name == "SimpleEmbeddings":
+        from embeddings import SimpleEmbeddings
+        return SimpleEmbeddings
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 # Function to extract text from a website
 def extract_website_content(url):
+    import requests
+    from bs4 import BeautifulSoup
     try:
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
@@ -46,65 +81,50 @@ def extract_website_content(url):
         return None
 
 # Function to split text into chunks
-def split_text_into_chunks(text):
+def split_text_into_chunks(text, chunk_size=1000, chunk_overlap=100):
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
     splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000,
-        chunk_overlap=100,
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
         length_function=len,
     )
     chunks = splitter.split_text(text)
     return chunks
 
-# Simple embedding function to avoid dependency issues
-class SimpleEmbeddings(Embeddings):
-    """Simple deterministic embeddings based on text hash"""
-    
-    def __init__(self, size=768):
-        """Initialize with embedding dimension size"""
-        self.size = size
-        # Use internal variables not tracked by pydantic
-        self._seed = 123
-        
-    def embed_documents(self, texts):
-        """Generate deterministic embeddings based on text content hash."""
-        np.random.seed(self._seed)
-        embeddings = []
-        for text in texts:
-            # Use hash of text to generate a deterministic seed for this text
-            text_seed = hash(text) % 10000
-            np.random.seed(text_seed)
-            embeddings.append(np.random.rand(self.size).astype(np.float32))
-        return embeddings
-        
-    def embed_query(self, text):
-        """Generate a single embedding for query text."""
-        return self.embed_documents([text])[0]
-
 # Function to create a vector store from chunks
-def create_vectorstore(chunks):
-    embeddings = SimpleEmbeddings()
+def create_vectorstore(chunks, embeddings=None):
+    from langchain_community.vectorstores import FAISS
+    from embeddings import get_default_embeddings
+    from index_store import publish_shared_index, shared_index_key
+    embeddings = embeddings or get_default_embeddings()
+    # Replicas on one host share a memory-mapped copy of each index
+    shared_dir = os.getenv("SHARED_INDEX_DIR")
+    if shared_dir:
+        return publish_shared_index(chunks, shared_dir, embeddings)
     vectorstore = FAISS.from_texts(texts=chunks, embedding=embeddings)
+    vectorstore.index_version = shared_index_key(chunks, getattr(embeddings, "backend_id", type(embeddings).__name__))
     return vectorstore
 
-# Function to generate a response using RAG
-def generate_rag_response(query, vectorstore):
-    # Retrieve relevant chunks
-    docs = vectorstore.similarity_search(query, k=4)
-    context = "\n".join([doc.page_content for doc in docs])
-    
-    # Initialize the Google Gemini client
-    google_key = (
-        os.getenv("GOOGLE_API_KEY")
-        or (st.secrets.get("GOOGLE_API_KEY") if hasattr(st, "secrets") else None)
-        or st.session_state.google_api_key
-    )
-    llm = ChatGoogleGenerativeAI(
-        google_api_key=google_key,
-        model="gemini-1.5-flash"
-    )
-    
-    # Create a prompt template
-    template = """
+# Function to report embedding throughput and cache hit rate
+def get_embedding_stats(embeddings=None):
+    from embeddings import get_default_embeddings
+    embeddings = embeddings or get_default_embeddings()
+    return embeddings.stats()
+
+# Identical questions against the same index and context share one LLM call
+_inflight = SingleFlight()
+
+# Every LLM call gets a deadline, jittered retries and a shared circuit breaker
+_llm_caller = ResilientCaller(
+    deadline=float(os.getenv("LLM_DEADLINE_SECONDS", "30")),
+    max_attempts=int(os.getenv("LLM_MAX_ATTEMPTS", "3")),
+    breaker=CircuitBreaker(
+        failure_threshold=int(os.getenv("LLM_BREAKER_THRESHOLD", "5")),
+        reset_timeout=float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30")),
+    ),
+)
+
+RAG_PROMPT_TEMPLATE = """
     You are a helpful AI assistant that answers questions about website content.
     
     CONTEXT:
@@ -121,20 +141,67 @@ def generate_rag_response(query, vectorstore):
     
     YOUR RESPONSE:
     """
-    
-    prompt = ChatPromptTemplate.from_template(template)
-    
-    # Create a chain
-    chain = (
-        prompt 
-        | llm 
-        | StrOutputParser()
+
+# Function to create the Google Gemini client
+def get_llm():
+    # The client's own retries are off: _llm_caller is the only retry layer
+    from gemini import SingleAttemptGemini
+    google_key = (
+        os.getenv("GOOGLE_API_KEY")
+        or (st.secrets.get("GOOGLE_API_KEY") if hasattr(st, "secrets") else None)
+        or st.session_state.google_api_key
+    )
+    return SingleAttemptGemini(
+        google_api_key=google_key,
+        model="gemini-1.5-flash",
+        request_timeout=_llm_caller.deadline,
     )
+
+# Function to report rerank cost percentiles and budget fallbacks
+def get_retrieval_stats():
+    import retrieval
+    return retrieval.get_retrieval_stats()
+
+# Function to report how many LLM calls were coalesced
+def get_coalescing_stats():
+    return _inflight.stats()
+
+# Function to report LLM tail latency, retries and circuit breaker state
+def get_llm_stats():
+    return _llm_caller.stats()
+
+# Function to generate a response using RAG
+def generate_rag_response(query, vectorstore, k=4, fetch_k=50, rerank_budget_ms=25, llm=None, deadline=None):
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_core.output_parsers import StrOutputParser
+    from retrieval import retrieve
     
-    # Get the response
-    response = chain.invoke({
-        "context": context,
-        "question": query
-    })
+    # Retrieve relevant chunks: over-fetch, then rerank within the time budget
+    docs = retrieve(vectorstore, query, k=k, fetch_k=fetch_k, budget_ms=rerank_budget_ms)
+    context = "\n".join([doc.page_content for doc in docs])
+    # Resolve the client here: the call itself runs off the Streamlit script thread
+    llm = llm or get_llm()
     
-    return response
+    def invoke():
+        prompt = ChatPromptTemplate.from_template(RAG_PROMPT_TEMPLATE)
+        
+        # Create a chain
+        chain = (
+            prompt 
+            | llm
+            | StrOutputParser()
+        )
+        
+        # Get the response
+        return chain.invoke({
+            "context": context,
+            "question": query
+        })
+    
+    key = (
+        getattr(vectorstore, "index_version", None) or f"object-{id(vectorstore)}",
+        hashlib.sha256(context.encode("utf-8")).hexdigest(),
+        query,
+    )
+    deadline = _llm_caller.deadline if deadline is None else deadline
+    return _inflight.do(key, lambda: _llm_caller.call(invoke, deadline=deadline), timeout=deadline)